@@ -0,0 +1,86 @@
+"""Decode throughput of `/item/list` payloads.
+
+Compares the hand-written constructors (`types.maplist(data, _Item)`)
+with the compiled decoders (`decoder.decode_list(_Item, data)`, eager and
+lazy), with and without a key the schema does not know about.
+
+Most of the eager time is the cyclic GC running while 100k+ new objects
+are allocated; pyeagle leaves the collector alone, so the "gc off" case
+shows what an application gets by pausing it around a bulk decode
+itself. At 100k items with known keys this measured about 1.1x for
+`decode_list`, 1.2-1.4x for `lazy` and 1.8-2.3x with the GC paused,
+each over `maplist`. `--min-speedup` exits non-zero when `decode_list`
+falls below the given ratio (e.g. 1.0 to catch a regression behind
+`maplist`).
+
+    python -m benchmarks.bench_decode [-n COUNT] [-r REPEAT] [--min-speedup RATIO]
+"""
+import argparse
+import gc
+import sys
+import time
+import warnings
+
+from pyeagle import decoder, types
+
+from .synthetic import synthetic_item
+
+
+def best_of(repeat: int, func, data) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        # start every sample from the same collector state
+        gc.collect()
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=100_000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('--min-speedup', type=float, default=None,
+                        help='fail unless decode_list is this many times faster than maplist')
+    args = parser.parse_args()
+
+    def gc_off(d):
+        gc.disable()
+        try:
+            return decoder.decode_list(types._Item, d)
+        finally:
+            gc.enable()
+
+    payload = [synthetic_item(i) for i in range(args.count)]
+    drifted = [dict(d, newField=i) for i, d in enumerate(payload)]
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        cases = [
+            ('maplist', lambda d: types.maplist(d, types._Item)),
+            ('decode_list', lambda d: decoder.decode_list(types._Item, d)),
+            ('lazy', lambda d: decoder.decode_list(types._Item, d, lazy=True)),
+            ('gc off', gc_off),
+        ]
+        print(f'items: {args.count}')
+        speedups = {}
+        for label, data in [('known keys', payload), ('unknown key', drifted)]:
+            times = {}
+            for name, func in cases:
+                types._warned_keys.clear()
+                caught.clear()
+                elapsed = times[name] = best_of(args.repeat, func, data)
+                print(f'{label:12s} {name:12s} {elapsed:7.3f} s  '
+                      f'{args.count / elapsed:10.0f} items/s  {len(caught):7d} warnings  '
+                      f'{times["maplist"] / elapsed:5.2f}x')
+            speedups[label] = times['maplist'] / times['decode_list']
+
+    if args.min_speedup is not None and speedups['known keys'] < args.min_speedup:
+        print(f'decode_list is {speedups["known keys"]:.2f}x maplist, '
+              f'expected at least {args.min_speedup:.2f}x', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Memory footprint of response records.
+
+Compares the slotted `types._Item` records with the previous
+`__dict__`-backed layout, which kept every attribute (UNDEFINED ones
+included) in a per-instance dict.
+
+    python -m benchmarks.bench_memory [-n COUNT]
+"""
+import argparse
+import gc
+import tracemalloc
+import warnings
+
+from pyeagle import types
+
+from .synthetic import synthetic_item
+
+
+class _DictResponce():
+    """Stand-in for the previous `APIResponce`, which stored attributes in `__dict__`."""
+
+
+def to_dict_backed(o):
+    if isinstance(o, types.APIResponce):
+        legacy = _DictResponce()
+        for k, v in o._items():
+            setattr(legacy, k, to_dict_backed(v))
+        return legacy
+    elif isinstance(o, list) and o and isinstance(o[0], types.APIResponce):
+        return [to_dict_backed(v) for v in o]
+    return o
+
+
+def measure(n: int) -> tuple[int, int]:
+    raw = [synthetic_item(i) for i in range(n)]
+    gc.collect()
+    tracemalloc.start()
+
+    base = tracemalloc.get_traced_memory()[0]
+    items = [types._Item(**d) for d in raw]
+    gc.collect()
+    slotted = tracemalloc.get_traced_memory()[0] - base
+
+    legacy = [to_dict_backed(o) for o in items]
+    del items
+    gc.collect()
+    dict_backed = tracemalloc.get_traced_memory()[0] - base
+
+    tracemalloc.stop()
+    del legacy
+    return slotted, dict_backed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--count', type=int, default=100_000)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    slotted, dict_backed = measure(args.count)
+    print(f'items            : {args.count}')
+    print(f'__dict__ records : {dict_backed / 2**20:8.1f} MiB ({dict_backed / args.count:6.0f} B/item)')
+    print(f'__slots__ records: {slotted / 2**20:8.1f} MiB ({slotted / args.count:6.0f} B/item)')
+    print(f'saved            : {1 - slotted / dict_backed:8.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Import and construction cost of pyeagle.
+
+Import time is measured in fresh interpreters, against importing the
+dependencies `import pyeagle` used to pull in eagerly (requests, numpy,
+chardet). Construction is measured against a local stub server whose
+`/library/info` returns a synthetic library of `--folders` folders:
+`EagleAPI()` no longer makes a request, and `__libpath__` is read from
+the raw payload instead of a fully decoded `LIBRARY.info()`.
+
+    python -m benchmarks.bench_startup [-r REPEAT] [--folders COUNT]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pyeagle
+
+from .synthetic import synthetic_library_info
+
+IMPORT_SNIPPET = 'import time; t = time.perf_counter(); {}; print(time.perf_counter() - t)'
+
+
+def import_time(statement: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET.format(statement)],
+                             capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout))
+    return statistics.median(samples)
+
+
+def serve(payload: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('--folders', type=int, default=20_000)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    lazy = import_time('import pyeagle', args.repeat)
+    eager = import_time('import pyeagle, requests, numpy, chardet', args.repeat)
+    print(f'import pyeagle                      : {lazy * 1000:8.1f} ms')
+    print(f'  + requests, numpy, chardet (eager): {eager * 1000:8.1f} ms')
+
+    payload = json.dumps({'status': 'success',
+                          'data': synthetic_library_info(args.folders)}).encode()
+    server = serve(payload)
+    url = 'http://127.0.0.1:%d' % server.server_address[1]
+    try:
+        construct = timed(lambda: pyeagle.EagleAPI(url), args.repeat)
+        api = pyeagle.EagleAPI(url)
+        api.LIBRARY.info()  # warm up the connection and decoders
+        libpath = timed(api._get_libpath, args.repeat)
+        decoded = timed(lambda: api.LIBRARY.info().library.path, args.repeat)
+    finally:
+        server.shutdown()
+
+    print(f'EagleAPI()                          : {construct * 1000:8.3f} ms')
+    print(f'__libpath__ from raw /library/info  : {libpath * 1000:8.1f} ms')
+    print(f'LIBRARY.info().library.path (before): {decoded * 1000:8.1f} ms '
+          f'({args.folders} folders)')
+
+
+if __name__ == '__main__':
+    main()
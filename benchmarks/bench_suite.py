@@ -0,0 +1,214 @@
+"""End-to-end pyeagle benchmarks against the local fake Eagle server.
+
+Covers listing, decoding, bulk update, importFolder, folder lookups,
+the response cache and EaglePack export. Results can be written to JSON and compared with an
+earlier run to spot regressions:
+
+    python -m benchmarks.bench_suite [--items N] [--latency S] [--only NAME ...]
+                                     [--save results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import pyeagle
+from pyeagle import decoder, types
+
+from .fake_eagle import FakeEagle
+
+
+def timed(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_listing(fake: FakeEagle, args) -> dict[str, float]:
+    api = pyeagle.EagleAPI(fake.url)
+    pages = (len(fake.items) + args.page_size - 1) // args.page_size
+    return {
+        'ITEM.list (all pages)': timed(lambda: [api.ITEM.list(args.page_size, offset=p)
+                                                for p in range(pages)], args.repeat),
+        'ITEM.iter (prefetch)': timed(lambda: sum(1 for _ in api.ITEM.iter(pageSize=args.page_size)),
+                                      args.repeat),
+        'ITEM.pages (raw)': timed(lambda: sum(map(len, api.ITEM.pages(pageSize=args.page_size))),
+                                  args.repeat),
+    }
+
+
+def bench_decoding(fake: FakeEagle, args) -> dict[str, float]:
+    data = fake.items
+    return {
+        'maplist _Item': timed(lambda: types.maplist(data, types._Item), args.repeat),
+        'decode_list _Item': timed(lambda: decoder.decode_list(types._Item, data), args.repeat),
+        'decode_list _Item (lazy)': timed(lambda: decoder.decode_list(types._Item, data, lazy=True),
+                                          args.repeat),
+        'decode _LibraryInfo': timed(lambda: decoder.decode(types._LibraryInfo,
+                                                            fake.get('/library/info', {})),
+                                     args.repeat),
+    }
+
+
+def bench_bulk_update(fake: FakeEagle, args) -> dict[str, float]:
+    api = pyeagle.EagleAPI(fake.url)
+    ids = [item['id'] for item in fake.items[:args.updates]]
+
+    def sequential():
+        for id in ids:
+            api.ITEM.update(id, tags=['bench'])
+
+    def bulk():
+        updater = pyeagle.BulkUpdater(api, concurrency=8)
+        for id in ids:
+            updater.update(id, annotation='bench')
+            updater.update(id, tags=['bench'])
+        updater.flush()
+
+    return {f'ITEM.update x{len(ids)} (sequential)': timed(sequential, args.repeat),
+            f'BulkUpdater x{len(ids)} (2 edits/item)': timed(bulk, args.repeat)}
+
+
+def bench_import(fake: FakeEagle, args) -> dict[str, float]:
+    api = pyeagle.EagleAPI(fake.url)
+    with tempfile.TemporaryDirectory() as root:
+        for d in range(args.import_dirs):
+            path = os.path.join(root, f'dir{d}')
+            os.makedirs(path)
+            for f in range(args.import_files):
+                open(os.path.join(path, f'file{f}.png'), 'wb').close()
+        files = args.import_dirs * args.import_files
+        return {f'importFolder {args.import_dirs} dirs / {files} files':
+                timed(lambda: api.util.importFolder(root, batchSize=100), args.repeat)}
+
+
+def bench_folders(fake: FakeEagle, args) -> dict[str, float]:
+    api = pyeagle.EagleAPI(fake.url)
+    # only the synthetic tree: other benchmarks may have created folders
+    ids = fake.syntheticFolderIds[:args.lookups]
+    names = [fake.folderById[id]['name'] for id in ids]
+    api.util.folderIndex()
+    return {
+        f'getFolderByID x{len(ids)}': timed(lambda: [api.util.getFolderByID(id) for id in ids],
+                                            args.repeat),
+        f'getFoldersByName x{len(ids)}': timed(lambda: [api.util.getFoldersByName(n) for n in names],
+                                               args.repeat),
+        'FOLDER.list': timed(api.FOLDER.list, args.repeat),
+    }
+
+
+def bench_cache(fake: FakeEagle, args) -> dict[str, float]:
+    api = pyeagle.EagleAPI(fake.url, cache=True)
+    id = fake.items[0]['id']
+
+    # callers own what they get back: mutating it must not leak into later hits
+    api.FOLDER.list(raw=True).clear()
+    api.ITEM.info(id).tags.append('mutated')
+    if not api.FOLDER.list(raw=True) or 'mutated' in api.ITEM.info(id).tags:
+        raise AssertionError('a mutated response leaked into the cache')
+    if api.cache.stats()['total']['hits'] < 2:  # type: ignore
+        raise AssertionError('the cache was not hit')
+
+    uncached = pyeagle.EagleAPI(fake.url)
+    return {
+        'FOLDER.list raw (uncached)': timed(lambda: uncached.FOLDER.list(raw=True), args.repeat),
+        'FOLDER.list raw (cache hit)': timed(lambda: api.FOLDER.list(raw=True), args.repeat),
+        f'ITEM.info x{args.lookups} (cache hit)':
+            timed(lambda: [api.ITEM.info(id) for _ in range(args.lookups)], args.repeat),
+    }
+
+
+def bench_export(fake: FakeEagle, args) -> dict[str, float]:
+    from pyeagle import eaglepack
+    with tempfile.TemporaryDirectory() as root:
+        chunk = os.urandom(args.export_size)
+        paths = []
+        for i in range(args.export_files):
+            path = os.path.join(root, f'file{i}.png')
+            with open(path, 'wb') as f:
+                f.write(chunk)
+            paths.append(path)
+        dst = os.path.join(root, 'bench.eaglepack')
+        items = list(eaglepack.EagleItem.bulk_build(paths))
+        mb = args.export_files * args.export_size / 1e6
+        return {f'exportEaglePack {args.export_files} files / {mb:.0f} MB':
+                timed(lambda: eaglepack.EaglePack(items).exportEaglePack(dst), args.repeat)}
+
+
+BENCHMARKS = {
+    'listing': bench_listing,
+    'decoding': bench_decoding,
+    'bulk_update': bench_bulk_update,
+    'import': bench_import,
+    'folders': bench_folders,
+    'cache': bench_cache,
+    'export': bench_export,
+}
+
+
+def environment() -> dict[str, str]:
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                  capture_output=True, text=True,
+                                  cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        revision = ''
+    return {'revision': revision, 'python': platform.python_version(),
+            'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10_000)
+    parser.add_argument('--folders', type=int, default=2_000)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the fake server sleeps per request')
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--updates', type=int, default=500)
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--import-dirs', type=int, default=20)
+    parser.add_argument('--import-files', type=int, default=250)
+    parser.add_argument('--export-files', type=int, default=200)
+    parser.add_argument('--export-size', type=int, default=256 * 1024)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS))
+    parser.add_argument('--save', metavar='PATH', help='write results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='JSON of an earlier run')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results: dict[str, dict[str, float]] = {}
+    with FakeEagle(args.items, args.folders, args.latency) as fake:
+        for name in args.only or BENCHMARKS:
+            results[name] = BENCHMARKS[name](fake, args)
+            print(f'[{name}]')
+            for case, seconds in results[name].items():
+                line = f'  {case:45s} {seconds * 1000:10.1f} ms'
+                before = baseline.get(name, {}).get(case)
+                if before:
+                    line += f'  ({seconds / before:5.2f}x of baseline)'
+                print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'environment': environment(), 'arguments': vars(args),
+                       'results': results}, f, indent=2)
+        print(f'saved to {args.save}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Local stand-in for the Eagle desktop app's HTTP API.
+
+Serves a synthetic library (see `synthetic.py`) over the same routes as
+Eagle (`/api/application/*`, `/api/library/*`, `/api/folder/*`,
+`/api/item/*`), with an optional fixed latency per request, so pyeagle
+can be benchmarked without a running Eagle.
+
+    python -m benchmarks.fake_eagle [--items N] [--folders N] [--latency S] [--port P]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from .synthetic import synthetic_folder_tree, synthetic_item
+
+
+def _walk(folders: list[dict]):
+    stack = list(folders)
+    while stack:
+        folder = stack.pop()
+        yield folder
+        stack.extend(folder['children'])
+
+
+class FakeEagle():
+    """Threaded HTTP server answering like Eagle for a synthetic library.
+
+    Parameters
+    ----------
+    items : int, optional
+        Number of items in the library.
+    folders : int, optional
+        Number of folders (a tree with 10 children per folder).
+    latency : float, optional
+        Seconds slept before answering each request.
+    libpath : str, optional
+        Library path reported by `/library/info`.
+    writeLibrary : bool, optional
+        Write `<libpath>/metadata.json` on start and on every folder
+        change, like Eagle does; False mimics a library on another host.
+    port : int, optional
+        0 picks a free port.
+    """
+
+    def __init__(self, items: int = 10_000, folders: int = 200, latency: float = 0.0,
+                 libpath: str = '/tmp/fake-eagle.library', port: int = 0,
+                 writeLibrary: bool = True) -> None:
+        self.latency = latency
+        self.libpath = libpath
+        self.writeLibrary = writeLibrary
+        self.items = [synthetic_item(i) for i in range(items)]
+        for i, item in enumerate(self.items):
+            item['folders'] = ['F%012d' % (i % max(folders, 1))] if folders else []
+        self.byId = {item['id']: item for item in self.items}
+        self.folders = synthetic_folder_tree(folders)
+        self.folderById = {f['id']: f for f in _walk(self.folders)}
+        # ids of the synthetic tree, before any /folder/create
+        self.syntheticFolderIds = list(self.folderById)
+        self.counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._next_folder = folders
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return 'http://127.0.0.1:%d' % self.server.server_address[1]
+
+    def _write_library(self) -> None:
+        if not self.writeLibrary:
+            return
+        os.makedirs(self.libpath, exist_ok=True)
+        with open(os.path.join(self.libpath, 'metadata.json'), 'w') as f:
+            json.dump({'folders': self.folders, 'modificationTime': int(time.time() * 1000)}, f)
+
+    def start(self) -> 'FakeEagle':
+        self._write_library()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # === routes ===
+
+    def _list_items(self, q: dict[str, str]) -> list[dict]:
+        found = self.items
+        if q.get('keyword'):
+            found = [i for i in found if q['keyword'] in i['name']]
+        if q.get('ext'):
+            found = [i for i in found if i['ext'] == q['ext']]
+        if q.get('tags'):
+            wanted = set(q['tags'].split(','))
+            found = [i for i in found if wanted <= set(i['tags'])]
+        if q.get('folders'):
+            wanted = set(q['folders'].split(','))
+            found = [i for i in found if wanted & set(i['folders'])]
+        # like Eagle, `offset` is a page index
+        limit = int(q.get('limit') or 200)
+        offset = int(q.get('offset') or 0)
+        return found[offset * limit:(offset + 1) * limit]
+
+    def get(self, path: str, q: dict[str, str]) -> Any:
+        if path == '/application/info':
+            return {'version': '3.0.0', 'prereleaseVersion': None, 'buildVersion': '1',
+                    'execPath': '/fake/eagle', 'platform': 'fake'}
+        if path == '/library/info':
+            return {'folders': self.folders, 'smartFolders': [], 'quickAccess': [],
+                    'tagsGroups': [], 'modificationTime': 1660000000000,
+                    'applicationVersion': '3.0.0',
+                    'library': {'path': self.libpath, 'name': 'fake'}}
+        if path == '/library/history':
+            return [self.libpath]
+        if path == '/folder/list':
+            return self.folders
+        if path == '/folder/listRecent':
+            return self.folders[:10]
+        if path == '/item/list':
+            return self._list_items(q)
+        if path == '/item/info':
+            return self.byId[q['id']]
+        if path == '/item/thumbnail':
+            item = self.byId[q['id']]
+            return f'{self.libpath}/images/{item["id"]}.info/{item["name"]}_thumbnail.png'
+        raise KeyError(path)
+
+    def post(self, path: str, body: dict[str, Any]) -> Any:
+        if path == '/folder/create':
+            with self._lock:
+                folder = {'id': 'F%012d' % self._next_folder, 'name': body['folderName'],
+                          'images': [], 'folders': [], 'modificationTime': int(time.time() * 1000),
+                          'imagesMappings': {}, 'tags': [], 'children': [], 'isExpand': True}
+                self._next_folder += 1
+                self.folderById[folder['id']] = folder
+                parent = self.folderById.get(body.get('parent') or '')
+                (parent['children'] if parent is not None else self.folders).append(folder)
+                self._write_library()
+            return folder
+        if path in ('/folder/rename', '/folder/update'):
+            folder = self.folderById[body['folderId']]
+            name = body.get('newName')
+            if name is not None:
+                with self._lock:
+                    folder['name'] = name
+                    self._write_library()
+            return folder
+        if path == '/item/update':
+            item = self.byId[body['id']]
+            for key in ('tags', 'annotation', 'url', 'star'):
+                if body.get(key) is not None:
+                    item[key] = body[key]
+            return item
+        if path in ('/item/addFromPaths', '/item/addFromURLs', '/item/addFromPath',
+                    '/item/addFromURL', '/item/addBookmark', '/item/moveToTrash',
+                    '/item/refreshPalette', '/item/refreshThumbnail', '/library/switch'):
+            return None
+        raise KeyError(path)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body are written separately; without this every
+            # keep-alive response waits for the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, route: str, answer) -> None:
+                with fake._lock:
+                    fake.counts[route] = fake.counts.get(route, 0) + 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                try:
+                    payload = {'status': 'success', 'data': answer()}
+                except KeyError as err:
+                    payload = {'status': 'error', 'message': f'not found: {err}'}
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                route = url.path.removeprefix('/api')
+                q = {k: v[0] for k, v in parse_qs(url.query).items()}
+                self._reply(route, lambda: fake.get(route, q))
+
+            def do_POST(self):
+                route = urlparse(self.path).path.removeprefix('/api')
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                self._reply(route, lambda: fake.post(route, body))
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10_000)
+    parser.add_argument('--folders', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=41595)
+    args = parser.parse_args()
+    with FakeEagle(args.items, args.folders, args.latency, port=args.port) as fake:
+        print(f'serving {args.items} items / {args.folders} folders on {fake.url}')
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
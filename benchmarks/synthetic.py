@@ -0,0 +1,58 @@
+"""Synthetic Eagle payloads shared by the benchmarks."""
+
+
+def synthetic_item(i: int) -> dict:
+    return {
+        'id': f'L{i:012d}',
+        'name': f'image_{i}',
+        'size': 1000 + i,
+        'btime': 1660000000000 + i,
+        'mtime': 1660000000000 + i,
+        'ext': 'png',
+        'tags': ['tag%d' % (i % 50), 'common'],
+        'folders': ['F%d' % (i % 20)],
+        'isDeleted': False,
+        'url': '',
+        'annotation': '',
+        'modificationTime': 1660000000000 + i,
+        'height': 1080,
+        'width': 1920,
+        'lastModified': 1660000000000 + i,
+        'palettes': [{'color': [i % 256, 20, 30], 'ratio': 50, '$$hashKey': 'object:%d' % i}],
+    }
+
+
+def synthetic_folder(i: int, children: list[dict] | None = None) -> dict:
+    return {
+        'id': f'F{i:012d}',
+        'name': f'folder_{i}',
+        'description': '',
+        'children': children or [],
+        'modificationTime': 1660000000000 + i,
+        'tags': [],
+        'imageCount': i % 100,
+        'descendantImageCount': i % 100,
+        'pinyin': f'folder_{i}',
+        'extendTags': [],
+    }
+
+
+def synthetic_folder_tree(count: int, fanout: int = 10) -> list[dict]:
+    """`count` folders, `fanout` children per folder, breadth first."""
+    folders = [synthetic_folder(i) for i in range(count)]
+    roots = folders[:fanout]
+    for i, folder in enumerate(folders[fanout:], start=fanout):
+        folders[i // fanout - 1]['children'].append(folder)
+    return roots
+
+
+def synthetic_library_info(folders: int, path: str = '/tmp/synthetic.library') -> dict:
+    return {
+        'folders': synthetic_folder_tree(folders),
+        'smartFolders': [],
+        'quickAccess': [],
+        'tagsGroups': [],
+        'modificationTime': 1660000000000,
+        'applicationVersion': '3.0.0',
+        'library': {'path': path, 'name': 'synthetic'},
+    }
@@ -1,4 +1,29 @@
 from .main import EagleAPI
+from .bulk import BulkUpdater
+from .library import ChangeFeed, LibraryReader
+from .transport import PooledTransport, Transport
 from . import types
-from . import eaglepack
-from .types import EagleJSONEncoder
\ No newline at end of file
+from .types import EagleJSONEncoder
+
+# numpy / asyncio / zipfile / sqlite3 users are imported on first access
+_LAZY = {
+    'AsyncEagleAPI': ('.aio', 'AsyncEagleAPI'),
+    'ItemTable': ('.itemtable', 'ItemTable'),
+    'MetadataIndex': ('.index', 'MetadataIndex'),
+    'eaglepack': ('.eaglepack', None),
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    module_name, attr = _LAZY[name]
+    module = importlib.import_module(module_name, __name__)
+    value = module if attr is None else getattr(module, attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,218 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal, overload
+
+from . import types
+from .decoder import decode, decode_list
+from .transport import PooledTransport, Transport
+
+
+class AsyncEagleAPI():
+    """asyncio version of `EagleAPI`.
+
+    Requests are sent through a `Transport` on a private thread pool, and
+    at most `concurrency` of them are in flight at once, so hundreds of
+    coroutines can be gathered without swamping the Eagle app.
+
+    `Utility` is not available here; use `EagleAPI` for library-path based
+    helpers.
+    """
+
+    def __init__(self, url='http://localhost:41595', *,
+                 transport: Transport | None = None,
+                 concurrency: int = 16, lazy: bool = False) -> None:
+        self.eagle_host = url
+        self.lazy = lazy
+        self.transport = (transport if transport is not None
+                          else PooledTransport(pool_size=concurrency))
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency,
+                                            thread_name_prefix='pyeagle-aio')
+        self.APPLICATION = _AsyncAPI_APPLICATION(self)
+        self.FOLDER = _AsyncAPI_FOLDER(self)
+        self.ITEM = _AsyncAPI_ITEM(self)
+        self.LIBRARY = _AsyncAPI_LIBRARY(self)
+
+    async def _call(self, func, *args) -> dict:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def get(self, _url: str, **query) -> dict:
+        if not _url.startswith('https://'):
+            _url = self.eagle_host + '/api' + _url
+        return await self._call(self.transport.get, _url, query)
+
+    async def post(self, _url: str, **query) -> dict:
+        if not _url.startswith('https://'):
+            _url = self.eagle_host + '/api' + _url
+        return await self._call(self.transport.post, _url,
+                                json.dumps(query, cls=types.EagleJSONEncoder))
+
+    def _decode(self, cls, data: dict):
+        return decode(cls, data, self.lazy)
+
+    def _decode_list(self, cls, data: list[dict]):
+        return decode_list(cls, data, self.lazy)
+
+    async def aclose(self):
+        # waiting for in-flight requests must not block the event loop
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+        self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+class _ASYNC_CHILD_API():
+    def __init__(self, api: AsyncEagleAPI) -> None:
+        self._api = api
+
+
+class _AsyncAPI_APPLICATION(_ASYNC_CHILD_API):
+    async def info(self):
+        res = await self._api.get('/application/info')
+        return (self._api._decode(types._ApplicationInfo, res['data'])
+                if res['status'] == 'success' else res)
+
+
+class _AsyncAPI_FOLDER(_ASYNC_CHILD_API):
+    async def create(self, folderName: str, parent: str | None = None):
+        res = await self._api.post('/folder/create', folderName=folderName, parent=parent)
+        return (self._api._decode(types._NewFolder, res['data'])
+                if res['status'] == 'success' else res)
+
+    async def rename(self, folderId: str, newName: str):
+        res = await self._api.post('/folder/rename', folderId=folderId, newName=newName)
+        return (self._api._decode(types._Folder, res['data'])
+                if res['status'] == 'success' else res)
+
+    async def update(self, folderId: str, newName: str | None = None,
+                     newDescription: str | None = None,
+                     newColor: types.COLOR | None = None):
+        res = await self._api.post('/folder/update', folderId=folderId, newName=newName,
+                                   newDescription=newDescription, newColor=newColor)
+        return (self._api._decode(types._Folder, res['data'])
+                if res['status'] == 'success' else res)
+
+    async def listRecent(self) -> list[types._Folder] | dict:
+        res = await self._api.get('/folder/listRecent')
+        return (self._api._decode_list(types._Folder, res['data'])
+                if res['status'] == 'success' else res)
+
+    _list = list
+
+    @overload
+    async def list(self) -> list[types._Folder] | dict[Any, Any]: ...
+    @overload
+    async def list(self, raw: Literal[True] = True) -> _list[dict[Any, Any]]: ...
+
+    async def list(self, raw=False) -> Any:
+        res = await self._api.get('/folder/list')
+        if not raw:
+            return (self._api._decode_list(types._Folder, res['data'])
+                    if res['status'] == 'success' else res)
+        else:
+            return res['data']
+
+
+class _AsyncAPI_ITEM(_ASYNC_CHILD_API):
+    async def addFromURL(self, url: str, name: str, *, website: str | None = None,
+                         tags: list[str] | None = None, annotation: str | None = None,
+                         modificationTime: int | None = None,
+                         folderId: str | None = None, headers: dict = {}):
+        res = await self._api.post('/item/addFromURL', url=url, name=name,
+                                   website=website, tags=tags, annotation=annotation,
+                                   modificationTime=modificationTime,
+                                   folderId=folderId, headers=headers)
+        return res
+
+    async def addFromURLs(self, items: list[types.OnlineItem], folderId: str | None = None):
+        res = await self._api.post('/item/addFromURLs', items=items, folderId=folderId)
+        return res
+
+    async def addFromPath(self, path: str, name: str, *, website: str | None = None,
+                          tags: list[str] | None = None, annotation: str | None = None,
+                          folderId: str | None = None):
+        res = await self._api.post('/item/addFromPath', path=path, name=name,
+                                   website=website, tags=tags, annotation=annotation,
+                                   folderId=folderId)
+        return res
+
+    async def addFromPaths(self, items: list[types.OfflineItem], folderId: str | None = None):
+        if len(items) > 0:
+            res = await self._api.post('/item/addFromPaths', items=items, folderId=folderId)
+            return res
+        else:
+            return
+
+    async def addBookmark(self, url: str, name: str, *, base64: str | None = None,
+                          tags: list[str] | None = None,
+                          modificationTime: int | None = None,
+                          folderId: str | None = None):
+        res = await self._api.post('/item/addBookmark', url=url, name=name,
+                                   base64=base64, tags=tags,
+                                   modificationTime=modificationTime,
+                                   folderId=folderId)
+        return res
+
+    async def info(self, id: str):
+        res = await self._api.get('/item/info', id=id)
+        return (self._api._decode(types._Item, res['data'])
+                if res['status'] == 'success' else res)
+
+    async def thumbnail(self, id: str) -> str | dict:
+        res = await self._api.get('/item/thumbnail', id=id)
+        return res['data'] if res['status'] == 'success' else res
+
+    async def moveToTrash(self, itemIds: list[str]):
+        res = await self._api.post('/item/moveToTrash', itemIds=itemIds)
+        return res
+
+    async def refreshPalette(self, id: str):
+        res = await self._api.post('/item/refreshPalette', id=id)
+        return res
+
+    async def refreshThumbnail(self, id: str):
+        res = await self._api.post('/item/refreshThumbnail', id=id)
+        return res
+
+    async def update(self, id: str, *, tags: list[str] | None = None,
+                     annotation: str | None = None, url: str | None = None,
+                     star: Literal[0, 1, 2, 3, 4, 5] | None = None,
+                     raw: bool = False):
+        res = await self._api.post('/item/update', id=id, tags=tags,
+                                   annotation=annotation, url=url, star=star)
+        if raw:
+            return res
+        return (self._api._decode(types._Item, res['data'])
+                if res['status'] == 'success' else res)
+
+    async def list(self, limit: int, *, keyword: str | None = None, ext: str | None = None,
+                   orderBy: types.ORDER | None = None, offset: int = 0,
+                   tags: list[str] = [], folders: list[str] = []) -> list[types._Item] | dict:
+        res = await self._api.get('/item/list', keyword=keyword, ext=ext,
+                                  orderBy=orderBy, limit=limit, offset=offset,
+                                  tags=','.join(tags), folders=','.join(folders))
+        return (self._api._decode_list(types._Item, res['data'])
+                if res['status'] == 'success' else res)
+
+
+class _AsyncAPI_LIBRARY(_ASYNC_CHILD_API):
+    async def info(self):
+        res = await self._api.get('/library/info')
+        return (self._api._decode(types._LibraryInfo, res['data'])
+                if res['status'] == 'success' else res)
+
+    async def history(self):
+        res = await self._api.get('/library/history')
+        return res['data'] if res['status'] == 'success' else res
+
+    async def switch(self, libraryPath: str):
+        res = await self._api.post('/library/switch', libraryPath=libraryPath)
+        return res
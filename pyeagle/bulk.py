@@ -0,0 +1,194 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Iterable, Literal, NamedTuple
+
+from . import types
+
+if TYPE_CHECKING:
+    from .main import EagleAPI
+
+
+class ItemEdit():
+    """Pending changes to one item, merged field by field.
+
+    `tags`, `annotation`, `url` and `star` replace the current value (a
+    later edit wins). `addTags` / `removeTags` are applied on top of the
+    final tags; when no explicit `tags` were given the item's current
+    tags are fetched first.
+    """
+    __slots__ = ('id', 'tags', 'annotation', 'url', 'star', 'addTags', 'removeTags')
+
+    def __init__(self, id: str) -> None:
+        self.id = id
+        self.tags: list[str] | None = None
+        self.annotation: str | None = None
+        self.url: str | None = None
+        self.star: int | None = None
+        self.addTags: dict[str, None] = {}
+        self.removeTags: set[str] = set()
+
+    def merge(self, *, tags: list[str] | None = None, annotation: str | None = None,
+              url: str | None = None, star: int | None = None,
+              addTags: Iterable[str] = (), removeTags: Iterable[str] = ()) -> None:
+        if tags is not None:
+            # explicit tags reset the pending deltas
+            self.tags = list(tags)
+            self.addTags.clear()
+            self.removeTags.clear()
+        if annotation is not None:
+            self.annotation = annotation
+        if url is not None:
+            self.url = url
+        if star is not None:
+            self.star = star
+        for tag in addTags:
+            self.removeTags.discard(tag)
+            self.addTags[tag] = None
+        for tag in removeTags:
+            self.addTags.pop(tag, None)
+            self.removeTags.add(tag)
+
+    @property
+    def needsTags(self) -> bool:
+        return self.tags is None and bool(self.addTags or self.removeTags)
+
+    def finalTags(self, current: list[str] | None) -> list[str] | None:
+        base = self.tags if self.tags is not None else current
+        if base is None:
+            return None
+        if not (self.addTags or self.removeTags):
+            return base
+        tags = [t for t in base if t not in self.removeTags]
+        tags += [t for t in self.addTags if t not in tags]
+        return tags
+
+
+class UpdateFailure(NamedTuple):
+    edit: ItemEdit
+    response: Any
+    error: BaseException | None
+
+
+class UpdateReport(NamedTuple):
+    updated: list[str]
+    failed: dict[str, UpdateFailure]
+    items: dict[str, types._Item]
+    attempts: int
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+class BulkUpdater():
+    """Queue many `ITEM.update` edits and send them concurrently.
+
+    Edits to the same item are merged into a single request. By default
+    responses are not decoded into `_Item` (the fast path of
+    `ITEM.update(raw=True)`). A failed item does not stop the others; it
+    is reported in `UpdateReport.failed` and can be sent again with
+    `retry()`.
+
+    Parameters
+    ----------
+    api : EagleAPI
+    concurrency : int, optional
+        `ITEM.update` requests in flight.
+    decode : bool, optional
+        Decode each updated item into `UpdateReport.items`.
+    retries : int, optional
+        Automatic extra rounds for items that failed in a `flush()`.
+    backoff : float, optional
+        Seconds to wait before the first automatic retry (doubled each round).
+    """
+
+    def __init__(self, api: 'EagleAPI', *, concurrency: int = 8, decode: bool = False,
+                 retries: int = 0, backoff: float = 0.5) -> None:
+        self.api = api
+        self.concurrency = concurrency
+        self.decode = decode
+        self.retries = retries
+        self.backoff = backoff
+        self._pending: dict[str, ItemEdit] = {}
+        self._lock = threading.Lock()
+        self.lastReport: UpdateReport | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # the report of the final flush is kept in `lastReport`
+        if exc_type is None:
+            self.flush()
+
+    def update(self, id: str, *, tags: list[str] | None = None,
+               annotation: str | None = None, url: str | None = None,
+               star: Literal[0, 1, 2, 3, 4, 5] | None = None,
+               addTags: Iterable[str] = (), removeTags: Iterable[str] = ()) -> None:
+        """Queue an edit of item `id` (merged with earlier queued edits)."""
+        with self._lock:
+            edit = self._pending.get(id)
+            if edit is None:
+                edit = self._pending[id] = ItemEdit(id)
+            edit.merge(tags=tags, annotation=annotation, url=url, star=star,
+                       addTags=addTags, removeTags=removeTags)
+
+    def _send(self, edit: ItemEdit) -> tuple[ItemEdit, Any, BaseException | None]:
+        try:
+            current = None
+            if edit.needsTags:
+                res = self.api.get('/item/info', id=edit.id)
+                if res.get('status') != 'success':
+                    return edit, res, None
+                current = res['data'].get('tags', [])
+            res = self.api.ITEM.update(edit.id, tags=edit.finalTags(current),
+                                       annotation=edit.annotation, url=edit.url,
+                                       star=edit.star, raw=True)  # type: ignore
+            return edit, res, None
+        except Exception as err:
+            return edit, None, err
+
+    def _run(self, edits: list[ItemEdit]) -> UpdateReport:
+        from concurrent.futures import ThreadPoolExecutor
+        start = time.perf_counter()
+        updated: list[str] = []
+        failed: dict[str, UpdateFailure] = {}
+        items: dict[str, types._Item] = {}
+        attempts = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix='pyeagle-update') as pool:
+            for attempt in range(self.retries + 1):
+                if attempt > 0:
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                attempts += len(edits)
+                retry = []
+                for edit, res, error in pool.map(self._send, edits):
+                    if error is None and isinstance(res, dict) and res.get('status') == 'success':
+                        failed.pop(edit.id, None)
+                        updated.append(edit.id)
+                        if self.decode:
+                            items[edit.id] = self.api._decode(types._Item, res['data'],
+                                                              '/item/update')
+                    else:
+                        failed[edit.id] = UpdateFailure(edit, res, error)
+                        retry.append(edit)
+                if not retry:
+                    break
+                edits = retry
+        self.lastReport = UpdateReport(updated, failed, items, attempts,
+                                       time.perf_counter() - start)
+        return self.lastReport
+
+    def flush(self) -> UpdateReport:
+        """Send every queued edit and clear the queue."""
+        with self._lock:
+            edits, self._pending = list(self._pending.values()), {}
+        return self._run(edits)
+
+    def retry(self, report: UpdateReport) -> UpdateReport:
+        """Send again only the edits that failed in `report`."""
+        return self._run([failure.edit for failure in report.failed.values()])
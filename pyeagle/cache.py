@@ -0,0 +1,208 @@
+import collections
+import marshal
+import threading
+import time
+from typing import Any, Callable
+
+# seconds a successful response stays valid, per GET endpoint; endpoints
+# not listed are never cached
+DEFAULT_TTL: dict[str, float] = {
+    '/application/info': 300.0,
+    '/library/info': 30.0,
+    '/library/history': 30.0,
+    '/folder/list': 30.0,
+    '/folder/listRecent': 10.0,
+    '/item/info': 10.0,
+}
+
+_FOLDERS = ('/folder/list', '/folder/listRecent', '/library/info')
+
+# endpoints whose cached responses a successful POST makes stale
+INVALIDATES: dict[str, tuple[str, ...]] = {
+    '/folder/create': _FOLDERS,
+    '/folder/rename': _FOLDERS,
+    '/folder/update': _FOLDERS,
+    '/item/update': ('/item/info',),
+    '/item/refreshPalette': ('/item/info',),
+    '/item/refreshThumbnail': ('/item/info',),
+    '/item/moveToTrash': ('/item/info',) + _FOLDERS,
+    '/item/addFromURL': _FOLDERS,
+    '/item/addFromURLs': _FOLDERS,
+    '/item/addFromPath': _FOLDERS,
+    '/item/addFromPaths': _FOLDERS,
+    '/item/addBookmark': _FOLDERS,
+    '/library/switch': (),  # everything, see `invalidateFor`
+}
+
+
+class _InFlight():
+    __slots__ = ('event', 'result', 'frozen', 'error')
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.frozen: bytes | None = None
+        self.error: BaseException | None = None
+
+
+def _freeze(res: Any) -> bytes | None:
+    # JSON payloads only hold types marshal supports; it copies them back
+    # several times faster than deepcopy or json
+    try:
+        return marshal.dumps(res)
+    except ValueError:
+        return None
+
+
+class ResponseCache():
+    """TTL cache of raw GET responses for `EagleAPI(cache=...)`.
+
+    Only successful responses of the endpoints in `ttl` are kept.
+    Concurrent identical requests are coalesced into one call to the
+    server. A successful POST to a mutating endpoint drops the
+    responses it makes stale (`INVALIDATES`); `LIBRARY.switch` clears
+    everything.
+
+    At most `maxsize` responses are kept; the least recently used one is
+    dropped first, and expired entries are evicted as they are looked up
+    or when the cache is full.
+
+    Responses are stored serialized, so every caller (cache hit or
+    coalesced request) gets its own copy and may mutate it freely.
+
+    Parameters
+    ----------
+    ttl : dict[str, float] | None, optional
+        Per-endpoint TTL in seconds, merged over `DEFAULT_TTL`. Set an
+        endpoint to 0 to disable caching it.
+    maxsize : int, optional
+        Maximum number of cached responses.
+    """
+
+    def __init__(self, ttl: dict[str, float] | None = None, maxsize: int = 4096) -> None:
+        self.ttl = dict(DEFAULT_TTL)
+        if ttl is not None:
+            self.ttl.update(ttl)
+        self.maxsize = maxsize
+        self._entries: collections.OrderedDict[tuple, tuple[float, bytes]] = collections.OrderedDict()
+        self._inflight: dict[tuple, _InFlight] = {}
+        self._generation = 0
+        self._swept = 0.0
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _count(self, endpoint: str, key: str) -> None:
+        counts = self._stats.get(endpoint)
+        if counts is None:
+            counts = self._stats[endpoint] = {'hits': 0, 'misses': 0, 'coalesced': 0,
+                                              'invalidations': 0}
+        counts[key] += 1
+
+    def get(self, endpoint: str, query: dict[str, Any], fetch: Callable[[], dict]) -> dict:
+        """Return the cached response of `endpoint` + `query`, or `fetch()` it."""
+        ttl = self.ttl.get(endpoint, 0)
+        if ttl <= 0:
+            return fetch()
+
+        key = (endpoint, tuple(sorted(query.items(), key=lambda kv: kv[0])))
+        try:
+            hash(key)
+        except TypeError:
+            return fetch()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count(endpoint, 'hits')
+            else:
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    owner = self._inflight[key] = _InFlight()
+                    generation = self._generation
+                    self._count(endpoint, 'misses')
+                else:
+                    self._count(endpoint, 'coalesced')
+        if entry is not None:
+            return marshal.loads(entry[1])
+
+        if waiting is not None:
+            waiting.event.wait()
+            if waiting.error is not None:
+                raise waiting.error
+            if waiting.frozen is not None:
+                return marshal.loads(waiting.frozen)
+            return waiting.result
+
+        try:
+            res = fetch()
+            owner.result = res
+            # snapshot before the caller can touch `res`
+            owner.frozen = _freeze(res)
+        except BaseException as err:
+            owner.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                # a response fetched across an invalidation may already be stale
+                if (owner.error is None and owner.frozen is not None
+                        and generation == self._generation
+                        and isinstance(res, dict) and res.get('status') == 'success'):
+                    self._store(key, time.monotonic() + ttl, owner.frozen)
+            owner.event.set()
+        return res
+
+    def _store(self, key: tuple, expires: float, frozen: bytes) -> None:
+        # called with the lock held
+        entries = self._entries
+        entries[key] = (expires, frozen)
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            # sweep expired entries at most once a second, then fall back to LRU
+            now = time.monotonic()
+            if now - self._swept >= 1.0:
+                self._swept = now
+                for k in [k for k, (until, _) in entries.items() if until <= now]:
+                    del entries[k]
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+    def invalidate(self, *endpoints: str) -> None:
+        """Drop cached responses of `endpoints` (all of them when none given)."""
+        with self._lock:
+            self._generation += 1
+            if not endpoints:
+                dropped = list(self._entries)
+                self._entries.clear()
+            else:
+                dropped = [k for k in self._entries if k[0] in endpoints]
+                for k in dropped:
+                    del self._entries[k]
+            for endpoint, _ in dropped:
+                self._count(endpoint, 'invalidations')
+
+    def invalidateFor(self, endpoint: str, res: Any) -> None:
+        """Apply the invalidation rules of a POST to `endpoint` that returned `res`."""
+        if endpoint not in INVALIDATES:
+            return
+        if not (isinstance(res, dict) and res.get('status') == 'success'):
+            return
+        targets = INVALIDATES[endpoint]
+        if targets:
+            self.invalidate(*targets)
+        else:
+            self.invalidate()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Per-endpoint hits / misses / coalesced / invalidations, plus a 'total'."""
+        with self._lock:
+            snapshot = {endpoint: dict(counts) for endpoint, counts in self._stats.items()}
+        total = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0}
+        for counts in snapshot.values():
+            for k, v in counts.items():
+                total[k] += v
+        snapshot['total'] = total
+        return snapshot
@@ -0,0 +1,148 @@
+from typing import Any, Callable, Type, TypeVar
+
+from . import types
+from .types import UNDEFINED
+
+R = TypeVar('R', bound=types.APIResponce)
+
+# marks a required constructor parameter in `_schema` defaults
+_EMPTY = object()
+
+_decoders: dict[tuple[type, bool], Callable[[dict], Any]] = {}
+_list_decoders: dict[tuple[type, bool], Callable[[list], Any]] = {}
+
+
+def _schema(cls: type) -> tuple[dict[str, Any], set[str], dict[str, str], dict[str, tuple[str, str]]]:
+    """Collect defaults, accepted keys, sources and nested specs of `cls`.
+
+    Parameters declared closer to `cls` in the MRO win, exactly like the
+    `**kwargs` chain of the hand-written constructors.
+    """
+    import inspect
+    defaults: dict[str, Any] = {}
+    accepted: set[str] = set()
+    sources: dict[str, str] = {}
+    nested: dict[str, tuple[str, str]] = {}
+    for klass in reversed(cls.__mro__):
+        if not issubclass(klass, types.APIResponce):
+            continue
+        sources.update(klass.__dict__.get('_sources', {}))
+        nested.update(klass.__dict__.get('_nested', {}))
+        if '__init__' not in klass.__dict__:
+            continue
+        for p in inspect.signature(klass.__init__).parameters.values():
+            if p.name == 'self' or p.kind is p.VAR_KEYWORD:
+                continue
+            accepted.add(p.name)
+            defaults[p.name] = _EMPTY if p.default is p.empty else p.default
+    return defaults, accepted, sources, nested
+
+
+def _compile(cls: Type[R], lazy: bool) -> Callable[[dict], R]:
+    defaults, accepted, sources, nested = _schema(cls)
+    # lazy objects are built as `lazy_variant(cls)`; unknown keys are still
+    # reported against `cls`
+    env: dict[str, Any] = {'new': object.__new__, 'cls': cls,
+                           'made': types.lazy_variant(cls) if lazy else cls,
+                           'UNDEFINED': UNDEFINED,
+                           'warn': types.warn_unknown_key, 'defer': _defer}
+    known = set(accepted)
+    lines = ['def decode(d):',
+             '    get = d.get',
+             '    o = new(made)',
+             '    try:',
+             '        pass']
+    for attr in cls._fields:
+        key = sources.get(attr, attr)
+        known.add(key)
+        default = defaults.get(key, UNDEFINED)
+        if default is _EMPTY:
+            value = f'd[{key!r}]'
+        else:
+            env[f'default_{attr}'] = default
+            value = f'get({key!r}, default_{attr})'
+
+        if attr in nested:
+            kind, target = nested[attr]
+            if kind == 'call':
+                env[f'conv_{attr}'] = getattr(cls, target)
+            elif kind == 'list':
+                env[f'conv_{attr}'] = list_decoder(getattr(types, target), lazy)
+            else:
+                env[f'conv_{attr}'] = _optional(decoder(getattr(types, target), lazy))
+            if lazy and kind != 'call':
+                value = f'defer({value}, conv_{attr})'
+            else:
+                value = f'conv_{attr}({value})'
+        lines.append(f'        o.{attr} = {value}')
+
+    env['known'] = frozenset(known)
+    env['missing'] = f'{cls.__name__} payload is missing required key '
+    lines += ['    except KeyError as err:',
+              '        raise TypeError(missing + str(err)) from None',
+              '    if d.keys() <= known:',
+              '        o._extra = None',
+              '    else:',
+              '        extra = o._extra = {}',
+              '        for k in d:',
+              '            if k not in known:',
+              '                warn(cls, k)',
+              '                extra[k] = d[k]',
+              '    return o']
+    exec('\n'.join(lines), env)
+    decode = env['decode']
+    decode.__qualname__ = decode.__name__ = f'decode_{cls.__name__}'
+    return decode
+
+
+def _defer(raw: Any, decode: Callable[[Any], Any]) -> Any:
+    if raw is UNDEFINED or raw is None:
+        return raw
+    return types.Pending(raw, decode)
+
+
+def _optional(func: Callable[[dict], Any]) -> Callable[[Any], Any]:
+    def decode(v):
+        return v if v is UNDEFINED or v is None else func(v)
+    return decode
+
+
+def decoder(cls: Type[R], lazy: bool = False) -> Callable[[dict], R]:
+    """Return the compiled decoder of a response class (built once per class).
+
+    With `lazy=True`, nested records and lists of records (folder children,
+    images, styles, palettes...) are kept as raw payloads and decoded the
+    first time the attribute is read.
+    """
+    compiled = _decoders.get((cls, lazy))
+    if compiled is None:
+        compiled = _decoders[cls, lazy] = _compile(cls, lazy)
+    return compiled
+
+
+def list_decoder(cls: Type[R], lazy: bool = False) -> Callable[[list[dict]], list[R]]:
+    """Return a bulk decoder for lists of `cls`, keeping UNDEFINED / None as-is."""
+    if (cls, lazy) in _list_decoders:
+        return _list_decoders[cls, lazy]
+
+    # resolved on first use, so self-referencing schemas (_Folder.children) compile
+    one = None
+
+    def decode_list(_l: list[dict]) -> list[R]:
+        nonlocal one
+        if _l is UNDEFINED or _l is None:
+            return _l  # type: ignore
+        if one is None:
+            one = decoder(cls, lazy)
+        return [one(d) for d in _l]
+
+    _list_decoders[cls, lazy] = decode_list
+    return decode_list
+
+
+def decode(cls: Type[R], data: dict, lazy: bool = False) -> R:
+    return decoder(cls, lazy)(data)
+
+
+def decode_list(cls: Type[R], data: list[dict], lazy: bool = False) -> list[R]:
+    return list_decoder(cls, lazy)(data)
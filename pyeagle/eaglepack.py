@@ -1,12 +1,24 @@
+import codecs
+import functools
+import itertools
 import json
+import mmap
 import os
 import pathlib
+import queue
 import random
+import shutil
+import struct
+import tempfile
+import threading
 import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import IO, Any, Callable, Iterable, Iterator, Literal, NamedTuple
 
-import chardet
-from numpy import base_repr
+from . import types
+from .decoder import decoder
+from .library import _ordered_chunks
 
 TYPE_IMAGE =  ['bmp', 'eps', 'gif', 'heic', 'ico', 'jpeg', 'jpg', 'png', 'svg',  # noqa: E222
                'tif', 'tiff', 'ttf', 'webp', 'base64']
@@ -23,21 +35,122 @@ CANPREVIEW =  (TYPE_IMAGE + TYPE_3D + TYPE_SOURCE + TYPE_VIDEO  # noqa: E222
                + TYPE_AUDIO + TYPE_FONT + TYPE_OFFICE)
 
 
+def _base36(n: int) -> str:
+    """`numpy.base_repr(n, 36)` for n >= 0, without importing numpy."""
+    digits = EagleItem.id_str
+    result = ''
+    while True:
+        n, r = divmod(n, 36)
+        result = digits[r] + result
+        if n == 0:
+            return result
+
+
+class EncodingCache():
+    """On-disk cache of detected `.txt` encodings keyed by (path, size, mtime).
+
+    Pass it to `EagleItem(encodingCache=...)` and call `save()` (or use it as
+    a context manager) so re-packing an unchanged corpus skips detection.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path, encoding='utf-8') as f:
+                self._entries: dict[str, str] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._entries = {}
+
+    @staticmethod
+    def _key(path: str, size: int, mtime: int) -> str:
+        return f'{os.path.abspath(path)}|{size}|{mtime}'
+
+    def get(self, path: str, size: int, mtime: int) -> str | None:
+        return self._entries.get(self._key(path, size, mtime))
+
+    def put(self, path: str, size: int, mtime: int, encoding: str) -> None:
+        key = self._key(path, size, mtime)
+        with self._lock:
+            if self._entries.get(key) != encoding:
+                self._entries[key] = encoding
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.save()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def detect_encoding(data: bytes, final: bool = True) -> str:
+    """Pick the encoding of `data`: utf-8, then shift-jis, then chardet.
+
+    With `final=False`, `data` is treated as a prefix, so a multi-byte
+    character cut at the end does not count as an error.
+    """
+    for encoding in ('utf-8', 'shift-jis'):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(data, final)
+            return encoding
+        except UnicodeDecodeError:
+            pass
+    import chardet
+    return chardet.detect(data)['encoding'] or 'utf-8'
+
+
 class EagleItem():
     id_str = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
     def __init__(self, path: str, *, name: str | None = None, tags: list[str] = [],
                  folders: list[str] = [], isDeleted: bool = False,
-                 url: str = '', annotation: str = '') -> None:
+                 url: str = '', annotation: str = '',
+                 stat: os.stat_result | None = None,
+                 textSample: int | None = None, textLimit: int | None = None,
+                 encodingCache: EncodingCache | None = None) -> None:
+        """
+        Parameters
+        ----------
+        path : str
+        stat : os.stat_result | None, optional
+            Stat result of `path`, if the caller already has one.
+        textSample : int | None, optional
+            Detect a `.txt` encoding from the first `textSample` bytes only
+            (None reads the whole file).
+        textLimit : int | None, optional
+            Embed at most this many characters of a `.txt` file in metadata.
+        encodingCache : EncodingCache | None, optional
+            Cache of detected encodings to read from and record into.
+        """
         self.path = path
         self.purepath = pathlib.PurePath(path.replace('\\', '/'))
-        file_stat = os.stat(self.path)
+        file_stat = stat if stat is not None else os.stat(self.path)
 
         now_ms = int(time.time() * 1000)
-        self.id = base_repr(now_ms, 36) + ''.join(random.choices(self.id_str, k=5))
+        self.id = _base36(now_ms) + ''.join(random.choices(self.id_str, k=5))
 
         self.name = name if name else self.purepath.stem
-        self.size = os.path.getsize(path)
+        self.size = file_stat.st_size
 
         mtime = file_stat.st_mtime
         try:
@@ -58,27 +171,104 @@ class EagleItem():
         self.modificationTime = now_ms
         self.lastModified = now_ms
 
+        self.textSample = textSample
+        self.textLimit = textLimit
+        self.textEncoding: str | None = None
         self.text = None
         self.palettes = None
         self.noPreview = False
-        self.check_text()
+        self.check_text(encodingCache)
         self.check_preview()
     
-    def check_text(self):
+    @classmethod
+    def bulk_build(cls, paths: Iterable[str | tuple[str, os.stat_result | None]], *,
+                   workers: int | None = None,
+                   executor: Literal['thread', 'process'] = 'thread',
+                   chunksize: int = 64, **kwargs) -> Iterator['EagleItem']:
+        """Build items for many files on a thread or process pool.
+
+        Items are yielded in the order of `paths`, with at most a few chunks
+        in flight, so the result can be passed straight to `EaglePack`.
+
+        Parameters
+        ----------
+        paths : Iterable[str | tuple[str, os.stat_result | None]]
+            File paths, optionally paired with an already known stat result.
+        workers : int | None, optional
+            Pool size (the executor's default when None).
+        executor : 'thread' | 'process', optional
+            Threads suit stat-bound work; processes suit text decoding.
+        chunksize : int, optional
+            Files built per task.
+        **kwargs
+            Passed to every `EagleItem` (tags, folders, annotation...).
+        """
+        pool_type = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        jobs = ((p, None) if isinstance(p, str) else p for p in paths)
+        window = 2 * (workers or os.cpu_count() or 1)
+        # process workers only update their own copy of the cache
+        cache = kwargs.get('encodingCache') if executor == 'process' else None
+        with pool_type(max_workers=workers) as pool:
+            for item in _ordered_chunks(pool, functools.partial(_build_items, cls, kwargs),
+                                        jobs, chunksize, window):
+                if cache is not None and item.textEncoding is not None:
+                    cache.put(item.path, item.size, item.mtime, item.textEncoding)
+                yield item
+
+    @classmethod
+    def from_directory(cls, root: str, *, recursive: bool = True,
+                       workers: int | None = None,
+                       executor: Literal['thread', 'process'] = 'thread',
+                       chunksize: int = 64, **kwargs) -> Iterator['EagleItem']:
+        """Build an item for every file under `root`.
+
+        The tree is walked with `os.scandir` in name order (files of a
+        directory before its subdirectories), and the stat result of each
+        entry is reused when the platform provides it for free.
+        """
+        return cls.bulk_build(_scan_files(root, recursive), workers=workers,
+                              executor=executor, chunksize=chunksize, **kwargs)
+
+    def check_text(self, encodingCache: EncodingCache | None = None):
+        """Detect the encoding of a `.txt` file; the text itself is read lazily."""
         if not self.ext == 'txt':
             return
-        
+
+        if encodingCache is not None:
+            self.textEncoding = encodingCache.get(self.path, self.size, self.mtime)
+            if self.textEncoding is not None:
+                return
+
         with open(self.path, 'rb') as f:
-            data = f.read()
-            try:
-                self.text = data.decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    self.text = data.decode('shift-jis')
-                except UnicodeDecodeError:
-                    encoding = chardet.detect(data)['encoding']
-                    self.text = data.decode(encoding=encoding, errors='replace')
-            del data
+            data = f.read() if self.textSample is None else f.read(self.textSample)
+        final = self.textSample is None or len(data) < self.textSample
+        self.textEncoding = detect_encoding(data, final)
+        del data
+
+        if encodingCache is not None:
+            encodingCache.put(self.path, self.size, self.mtime, self.textEncoding)
+
+    @property
+    def text(self) -> str | None:
+        if self._text is None and self.textEncoding is not None:
+            return self.read_text()
+        return self._text
+
+    @text.setter
+    def text(self, value: str | None):
+        self._text = value
+
+    def read_text(self) -> str:
+        """Decode the file with the detected encoding, up to `textLimit` characters."""
+        encoding = self.textEncoding or 'utf-8'
+        with open(self.path, 'rb') as f:
+            if self.textLimit is None:
+                return f.read().decode(encoding, errors='replace')
+            # no supported encoding needs more than 4 bytes per character
+            data = f.read(self.textLimit * 4)
+            final = len(data) < self.textLimit * 4
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        return decoder.decode(data, final)[:self.textLimit]
 
     def check_preview(self):
         if self.ext in CANPREVIEW:
@@ -102,8 +292,9 @@ class EagleItem():
             'modificationTime': self.modificationTime,
             'lastModified': self.lastModified
         }
-        if self.text is not None:
-            result['text'] = self.text
+        text = self.text
+        if text is not None:
+            result['text'] = text
         if self.palettes is not None:
             result['palettes'] = self.palettes
         if self.noPreview is True:
@@ -112,22 +303,278 @@ class EagleItem():
         return result
 
 
+def _scan_files(root: str, recursive: bool) -> Iterator[tuple[str, os.stat_result | None]]:
+    # DirEntry.stat() is free on Windows only; elsewhere the worker stats
+    reuse_stat = os.name == 'nt'
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir():
+                if recursive:
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry.path, entry.stat() if reuse_stat else None
+        stack.extend(reversed(subdirs))
+
+
+def _build_items(cls: type[EagleItem], kwargs: dict,
+                 jobs: list[tuple[str, os.stat_result | None]]) -> list[EagleItem]:
+    return [cls(path, stat=stat, **kwargs) for path, stat in jobs]
+
+
+class ExportProgress(NamedTuple):
+    items: int
+    total: int | None
+    bytes: int
+    elapsed: float
+
+    @property
+    def bytesPerSecond(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _readahead(items: Iterable[EagleItem], size: int) -> Iterator[EagleItem]:
+    """Pull up to `size` items ahead of the consumer on a background thread."""
+    done = object()
+    buffer: queue.Queue = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(obj) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(obj, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(done)
+        except BaseException as err:
+            put(err)
+
+    thread = threading.Thread(target=produce, name='eaglepack-readahead', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
 class EaglePack():
-    def __init__(self, items: list[EagleItem] | None = None) -> None:
-        self.items = items if items else []
-    
+    """A set of items to export as an `.eaglepack`.
+
+    `items` may be any iterable, including a generator, in which case it is
+    consumed once by `exportEaglePack` and never held in memory as a whole.
+    """
+
+    def __init__(self, items: Iterable[EagleItem] | None = None) -> None:
+        self.items: Iterable[EagleItem] = items if items is not None else []
+
     def appendItem(self, item: EagleItem):
-        self.items.append(item)
-    
-    def appendItems(self, items: list[EagleItem]):
-        self.items.extend(items)
-    
-    def exportEaglePack(self, dst):
-        with zipfile.ZipFile(dst, 'w', zipfile.ZIP_STORED, ) as zf:
-            images = []
-            for item in self.items:
-                metadata = item.get_metadata_dict()
+        self.appendItems([item])
+
+    def appendItems(self, items: Iterable[EagleItem]):
+        if isinstance(self.items, list) and isinstance(items, list):
+            self.items.extend(items)
+        else:
+            self.items = itertools.chain(self.items, items)
+
+    def exportEaglePack(self, dst, *,
+                        progress: Callable[[ExportProgress], None] | None = None,
+                        readahead: int = 0):
+        """Write the pack to `dst` with memory independent of its size.
+
+        Each item's metadata is written to the archive and appended to a
+        temporary `pack.json` spool on disk, which is copied into the archive
+        at the end.
+
+        Parameters
+        ----------
+        dst : str | PathLike | file object
+        progress : Callable[[ExportProgress], None] | None, optional
+            Called after every item with the running totals.
+        readahead : int, optional
+            Build up to this many items ahead of the writer on a background
+            thread (useful when `items` is a generator of `EagleItem`).
+        """
+        total = len(self.items) if hasattr(self.items, '__len__') else None  # type: ignore
+        items = _readahead(self.items, readahead) if readahead > 0 else iter(self.items)
+        start = time.perf_counter()
+        written = 0
+        count = 0
+
+        with zipfile.ZipFile(dst, 'w', zipfile.ZIP_STORED) as zf, \
+             tempfile.TemporaryFile() as spool:
+            spool.write(b'{"images": [')
+            for item in items:
+                metadata = json.dumps(item.get_metadata_dict(), ensure_ascii=False).encode('utf-8')
                 zf.write(item.path, arcname=f'{item.id}.info\\{item.name}.{item.ext}')
-                zf.writestr(f'{item.id}.info\\metadata.json', json.dumps(metadata, ensure_ascii=False))
-                images.append(metadata)
-            zf.writestr('pack.json', json.dumps({'images': images}, ensure_ascii=False))
\ No newline at end of file
+                zf.writestr(f'{item.id}.info\\metadata.json', metadata)
+                if count:
+                    spool.write(b', ')
+                spool.write(metadata)
+
+                count += 1
+                written += item.size + len(metadata)
+                if progress is not None:
+                    progress(ExportProgress(count, total, written, time.perf_counter() - start))
+            spool.write(b']}')
+
+            size = spool.tell()
+            spool.seek(0)
+            with zf.open('pack.json', 'w', force_zip64=size >= zipfile.ZIP64_LIMIT) as f:
+                shutil.copyfileobj(spool, f, 1024 * 1024)
+
+        if progress is not None:
+            progress(ExportProgress(count, total, written + size, time.perf_counter() - start))
+
+
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+
+
+class EaglePackReader():
+    """Read-only random access to an `.eaglepack`.
+
+    `pack.json` is parsed once into an id -> metadata index (packs without
+    it fall back to each item's `metadata.json`). Arcnames written with
+    either `\\` or `/` separators are accepted. Payloads of `ZIP_STORED`
+    entries can be viewed through an mmap without copying.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._file: IO[bytes] | None = None
+        self._mmap: mmap.mmap | None = None
+
+        # id -> {file name inside "<id>.info/": ZipInfo}
+        self._entries: dict[str, dict[str, zipfile.ZipInfo]] = {}
+        for info in self._zip.infolist():
+            head, _, tail = info.filename.replace('\\', '/').partition('/')
+            if head.endswith('.info') and tail:
+                self._entries.setdefault(head[:-5], {})[tail] = info
+
+        self._metadata: dict[str, dict[str, Any]] = {}
+        try:
+            with self._zip.open('pack.json') as f:
+                for metadata in json.load(f)['images']:
+                    self._metadata[metadata['id']] = metadata
+        except KeyError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the archive. Views returned by `view()` must be released first."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._zip.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._entries
+
+    def ids(self) -> list[str]:
+        return list(self._entries)
+
+    # === metadata ===
+
+    def metadata(self, id: str) -> dict[str, Any]:
+        if id not in self._metadata:
+            info = self._entry(id, 'metadata.json')
+            with self._zip.open(info) as f:
+                self._metadata[id] = json.load(f)
+        return self._metadata[id]
+
+    def item(self, id: str) -> types._Item:
+        return decoder(types._Item)(self.metadata(id))
+
+    def iterMetadata(self) -> Iterator[dict[str, Any]]:
+        for id in self._entries:
+            yield self.metadata(id)
+
+    def iterItems(self) -> Iterator[types._Item]:
+        decode_item = decoder(types._Item)
+        for id in self._entries:
+            yield decode_item(self.metadata(id))
+
+    # === payloads ===
+
+    def _entry(self, id: str, name: str) -> zipfile.ZipInfo:
+        try:
+            return self._entries[id][name]
+        except KeyError:
+            raise KeyError(f'"{id}.info/{name}" is not in {self.path}') from None
+
+    def fileInfo(self, id: str) -> zipfile.ZipInfo:
+        """Zip entry of the item's original file."""
+        metadata = self.metadata(id)
+        return self._entry(id, f'{metadata["name"]}.{metadata["ext"]}')
+
+    def open(self, id: str) -> IO[bytes]:
+        """Stream the item's file (works for any compression)."""
+        return self._zip.open(self.fileInfo(id))
+
+    def view(self, id: str) -> memoryview:
+        """Zero-copy view of a `ZIP_STORED` item file, backed by an mmap."""
+        info = self.fileInfo(id)
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f'{info.filename} is compressed; use open() instead')
+        if info.flag_bits & 0x1:
+            raise ValueError(f'{info.filename} is encrypted')
+
+        if self._mmap is None:
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _LOCAL_HEADER.unpack_from(self._mmap, info.header_offset)
+        if header[0] != b'PK\x03\x04':
+            raise zipfile.BadZipFile(f'bad local header for {info.filename}')
+        start = info.header_offset + _LOCAL_HEADER.size + header[-2] + header[-1]
+        return memoryview(self._mmap)[start:start + info.compress_size]
+
+    def extract(self, id: str, dst: str) -> str:
+        """Write the item's file into directory `dst` and return its path.
+
+        Raises ValueError when the pack's name/ext would point outside `dst`.
+        """
+        metadata = self.metadata(id)
+        filename = f'{metadata["name"]}.{metadata["ext"]}'
+        # name and ext come from the pack; never let them escape `dst`
+        if (os.path.basename(filename) != filename or '/' in filename or '\\' in filename
+                or filename in ('.', '..') or '\0' in filename):
+            raise ValueError(f'unsafe file name in {self.path}: {filename!r}')
+        root = os.path.realpath(dst)
+        path = os.path.join(root, filename)
+        if os.path.dirname(os.path.realpath(path)) != root:
+            raise ValueError(f'unsafe file name in {self.path}: {filename!r}')
+        if self.fileInfo(id).compress_type == zipfile.ZIP_STORED:
+            with self.view(id) as data, open(path, 'wb') as f:
+                f.write(data)
+        else:
+            with self.open(id) as src, open(path, 'wb') as f:
+                shutil.copyfileobj(src, f, 1024 * 1024)
+        return path
@@ -0,0 +1,346 @@
+import itertools
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Type
+
+from . import types
+from .types import UNDEFINED
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from .main import EagleAPI
+
+
+def hash_file(path: str, algorithm: str = 'sha256') -> str:
+    """Hex digest of a file's content.
+
+    The file is mapped with mmap and handed to hashlib as a buffer, so
+    large files are never copied into Python bytes (hashlib also releases
+    the GIL while it runs, so several files hash in parallel on threads).
+    """
+    # hashlib / mmap / sqlite3 are imported on use, not at `import pyeagle`
+    import hashlib
+    import mmap
+    h = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                h.update(m)
+    return h.hexdigest()
+
+
+class ImportManifest():
+    """Persistent record of what an import has already sent to Eagle.
+
+    Folders are stored as relative path -> folder id as soon as they are
+    created, and files as relative path -> (size, mtime, content hash)
+    once their batch succeeded, so an interrupted import can be re-run:
+    existing folders are reused and unchanged files are skipped.
+
+    `addFromPaths` does not return item ids, so `itemId` stays None. A
+    batch that reached Eagle but was not recorded (the process died in
+    between) is sent again.
+
+    Parameters
+    ----------
+    path : str
+        SQLite file holding the manifest.
+    """
+
+    def __init__(self, path: str) -> None:
+        import sqlite3
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript('''
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS folders (relpath TEXT PRIMARY KEY, folderId TEXT);
+                CREATE TABLE IF NOT EXISTS files (
+                    relpath TEXT PRIMARY KEY, size INTEGER, mtime INTEGER,
+                    hash TEXT, itemId TEXT, folderId TEXT);
+                CREATE INDEX IF NOT EXISTS files_hash ON files (hash);
+            ''')
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def bind(self, src: str) -> None:
+        """Tie the manifest to the source directory `src` on first use."""
+        src = os.path.abspath(src)
+        with self._lock, self._db:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'src'").fetchone()
+            if row is None:
+                self._db.execute("INSERT INTO meta VALUES ('src', ?)", (src,))
+            elif row[0] != src:
+                raise ValueError(f'{self.path} is the manifest of {row[0]}, not {src}')
+
+    def folder(self, relpath: str) -> str | None:
+        with self._lock:
+            row = self._db.execute('SELECT folderId FROM folders WHERE relpath = ?',
+                                   (relpath,)).fetchone()
+        return None if row is None else row[0]
+
+    def addFolder(self, relpath: str, folderId: str) -> None:
+        with self._lock, self._db:
+            self._db.execute('INSERT OR REPLACE INTO folders VALUES (?, ?)', (relpath, folderId))
+
+    def file(self, relpath: str) -> tuple[int, int, str] | None:
+        """(size, mtime_ns, hash) recorded for `relpath`."""
+        with self._lock:
+            return self._db.execute('SELECT size, mtime, hash FROM files WHERE relpath = ?',
+                                    (relpath,)).fetchone()
+
+    def hasHash(self, hash: str) -> bool:
+        with self._lock:
+            return self._db.execute('SELECT 1 FROM files WHERE hash = ? LIMIT 1',
+                                    (hash,)).fetchone() is not None
+
+    def addFiles(self, rows: list[tuple[str, int, int, str, str | None, str]]) -> None:
+        """Record (relpath, size, mtime_ns, hash, itemId, folderId) rows."""
+        with self._lock, self._db:
+            self._db.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    def touch(self, rows: list[tuple[int, int, str]]) -> None:
+        """Update (size, mtime_ns, relpath) of files whose content did not change."""
+        with self._lock, self._db:
+            self._db.executemany('UPDATE files SET size = ?, mtime = ? WHERE relpath = ?', rows)
+
+
+class BatchResult(NamedTuple):
+    folderId: str
+    directory: str
+    files: list[str]
+    response: Any
+    error: BaseException | None
+    elapsed: float
+    skipped: list[str]
+
+    @property
+    def ok(self) -> bool:
+        if self.error is not None:
+            return False
+        if not self.files:
+            return True
+        return isinstance(self.response, dict) and self.response.get('status') == 'success'
+
+
+class ImportReport(NamedTuple):
+    folderId: str
+    folders: int
+    files: int
+    batches: list[BatchResult]
+    elapsed: float
+
+    @property
+    def skipped(self) -> int:
+        """Files left out because the manifest already had them."""
+        return sum(len(b.skipped) for b in self.batches)
+
+    @property
+    def failed(self) -> list[BatchResult]:
+        return [b for b in self.batches if not b.ok]
+
+    @property
+    def filesPerSecond(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class _Directory(NamedTuple):
+    path: str
+    folderId: str
+
+
+class FolderImporter():
+    """Import a directory tree into Eagle, mirroring it as folders.
+
+    The tree is walked with `os.scandir` one level at a time. The folders
+    of a level are created concurrently (at most `folderConcurrency`
+    `FOLDER.create` calls in flight), and the files of every directory
+    are sent with `ITEM.addFromPaths` in batches of `batchSize`, up to
+    `concurrency` batches at once, while the next level is being created.
+
+    Hidden entries (names starting with '.') are skipped, like the glob
+    used before.
+
+    Parameters
+    ----------
+    api : EagleAPI
+    batchSize : int, optional
+        Files per `addFromPaths` request.
+    concurrency : int, optional
+        `addFromPaths` requests in flight.
+    folderConcurrency : int, optional
+        `FOLDER.create` requests in flight.
+    progress : Callable[[BatchResult], None] | None, optional
+        Called (from the calling thread) as each batch finishes.
+    manifest : ImportManifest | str | None, optional
+        Makes the import resumable: folders and files already recorded
+        are reused / skipped, a file is only re-sent when its content hash
+        changed. A path opens (or creates) the manifest there.
+    hashWorkers : int | None, optional
+        Threads hashing files for the manifest (the executor's default
+        when None).
+    skipDuplicates : bool, optional
+        With a manifest, also skip files whose content was already
+        imported from another path.
+    """
+
+    def __init__(self, api: 'EagleAPI', *, batchSize: int = 500,
+                 concurrency: int = 4, folderConcurrency: int = 4,
+                 progress: Callable[[BatchResult], None] | None = None,
+                 manifest: ImportManifest | str | None = None,
+                 hashWorkers: int | None = None,
+                 skipDuplicates: bool = False) -> None:
+        self.api = api
+        self.batchSize = batchSize
+        self.concurrency = concurrency
+        self.folderConcurrency = folderConcurrency
+        self.progress = progress
+        self._ownsManifest = isinstance(manifest, str)
+        self.manifest = ImportManifest(manifest) if isinstance(manifest, str) else manifest
+        self.hashWorkers = hashWorkers
+        self.skipDuplicates = skipDuplicates
+        self._src = ''
+        self._hashes = None
+
+    def close(self) -> None:
+        """Close the manifest if it was opened from a path."""
+        if self._ownsManifest and self.manifest is not None:
+            self.manifest.close()
+
+    def _relpath(self, path: str) -> str:
+        rel = os.path.relpath(path, self._src)
+        return '' if rel == os.curdir else rel.replace(os.sep, '/')
+
+    def _create_folder(self, name: str, parent: str | None, path: str | None = None) -> str:
+        if self.manifest is not None and path is not None:
+            folderId = self.manifest.folder(self._relpath(path))
+            if folderId is not None:
+                return folderId
+        folder = self.api.FOLDER.create(name, parent)
+        if not isinstance(folder, types._NewFolder):
+            raise RuntimeError(f'Create Folder Faild: {name} ({folder})')
+        if self.manifest is not None and path is not None:
+            self.manifest.addFolder(self._relpath(path), folder.id)
+        return folder.id
+
+    def _select(self, files: list[str]) -> tuple[list[str], list[str], list[tuple]]:
+        """Split `files` into (to send, skipped) and the manifest rows to write."""
+        manifest = self.manifest
+        assert manifest is not None
+        stats = [os.stat(path) for path in files]
+        relpaths = [self._relpath(path) for path in files]
+        known = [manifest.file(rel) for rel in relpaths]
+
+        # unchanged size and mtime: trust the recorded hash
+        check = [i for i, (st, rec) in enumerate(zip(stats, known))
+                 if rec is None or (rec[0], rec[1]) != (st.st_size, st.st_mtime_ns)]
+        hashes = dict(zip(check, self._hashes.map(hash_file, [files[i] for i in check])))  # type: ignore
+
+        send, skipped, touched, rows = [], [], [], []
+        for i, path in enumerate(files):
+            st, rec = stats[i], known[i]
+            if i not in hashes:
+                skipped.append(path)
+            elif rec is not None and rec[2] == hashes[i]:
+                skipped.append(path)
+                touched.append((st.st_size, st.st_mtime_ns, relpaths[i]))
+            elif self.skipDuplicates and manifest.hasHash(hashes[i]):
+                skipped.append(path)
+            else:
+                send.append(path)
+                rows.append((relpaths[i], st.st_size, st.st_mtime_ns, hashes[i], None))
+        if touched:
+            manifest.touch(touched)
+        return send, skipped, rows
+
+    def _add_batch(self, directory: _Directory, files: list[str],
+                   kwargs: dict[str, Any]) -> BatchResult:
+        start = time.perf_counter()
+        skipped: list[str] = []
+        rows: list[tuple] = []
+        response, error = None, None
+        try:
+            if self.manifest is not None:
+                files, skipped, rows = self._select(files)
+            items = [types.OfflineItem(os.path.abspath(path),
+                                       '.'.join(os.path.basename(path).split('.')[:-1]),
+                                       **kwargs)
+                     for path in files]
+            if items:
+                response = self.api.ITEM.addFromPaths(items, directory.folderId)
+                if (self.manifest is not None and isinstance(response, dict)
+                        and response.get('status') == 'success'):
+                    self.manifest.addFiles([row + (directory.folderId,) for row in rows])
+        except Exception as err:
+            error = err
+        return BatchResult(directory.folderId, directory.path, files, response, error,
+                           time.perf_counter() - start, skipped)
+
+    @staticmethod
+    def _scan(path: str) -> tuple[list[str], list[str]]:
+        """Subdirectories and files of `path`, in name order."""
+        with os.scandir(path) as it:
+            entries = sorted((e for e in it if not e.name.startswith('.')),
+                             key=lambda e: e.name)
+        return ([e.path for e in entries if e.is_dir()],
+                [e.path for e in entries if e.is_file()])
+
+    def run(self, src: str, name: str | None = None, parent: str | None = None,
+            website: str | Type[UNDEFINED] = UNDEFINED,
+            tags: list[str] | Type[UNDEFINED] = UNDEFINED,
+            annotation: str | Type[UNDEFINED] = UNDEFINED) -> ImportReport:
+        from concurrent.futures import ThreadPoolExecutor
+        start = time.perf_counter()
+        kwargs = dict(website=website, tags=tags, annotation=annotation)
+        self._src = os.path.abspath(src)
+        if self.manifest is not None:
+            self.manifest.bind(src)
+        root = _Directory(src, self._create_folder(name or os.path.basename(src), parent, src))
+
+        batches: list[BatchResult] = []
+        pending: list['Future'] = []
+        folders = 1
+        files = 0
+
+        def collect(block: bool) -> None:
+            while pending and (block or pending[0].done()):
+                result = pending.pop(0).result()
+                batches.append(result)
+                if self.progress is not None:
+                    self.progress(result)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix='pyeagle-import') as uploads, \
+             ThreadPoolExecutor(max_workers=self.folderConcurrency,
+                                thread_name_prefix='pyeagle-folder') as creates, \
+             ThreadPoolExecutor(max_workers=self.hashWorkers,
+                                thread_name_prefix='pyeagle-hash') as self._hashes:
+            level = [root]
+            while level:
+                children: list[tuple[str, 'Future']] = []
+                for directory in level:
+                    subdirs, paths = self._scan(directory.path)
+                    files += len(paths)
+                    it = iter(paths)
+                    while batch := list(itertools.islice(it, self.batchSize)):
+                        pending.append(uploads.submit(self._add_batch, directory, batch, kwargs))
+                    children += [(path, creates.submit(self._create_folder, os.path.basename(path),
+                                                       directory.folderId, path))
+                                 for path in subdirs]
+                    collect(False)
+                level = [_Directory(path, future.result()) for path, future in children]
+                folders += len(level)
+            collect(True)
+
+        return ImportReport(root.folderId, folders, files, batches,
+                            time.perf_counter() - start)
@@ -0,0 +1,326 @@
+import json
+import os
+import sqlite3
+from typing import Any, Iterable, Iterator
+
+from . import types
+from .decoder import list_decoder
+from .library import ChangeSet, LibraryReader, diff_mtimes
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY, mtime INTEGER, name TEXT, ext TEXT, size INTEGER,
+    btime INTEGER, width INTEGER, height INTEGER, star INTEGER,
+    isDeleted INTEGER, data TEXT);
+CREATE TABLE IF NOT EXISTS item_tags (item_id TEXT, tag TEXT);
+CREATE INDEX IF NOT EXISTS item_tags_tag ON item_tags (tag, item_id);
+CREATE INDEX IF NOT EXISTS item_tags_item ON item_tags (item_id);
+CREATE TABLE IF NOT EXISTS item_folders (item_id TEXT, folder_id TEXT);
+CREATE INDEX IF NOT EXISTS item_folders_folder ON item_folders (folder_id, item_id);
+CREATE INDEX IF NOT EXISTS item_folders_item ON item_folders (item_id);
+CREATE TABLE IF NOT EXISTS palettes (item_id TEXT, r INTEGER, g INTEGER, b INTEGER, ratio REAL);
+CREATE INDEX IF NOT EXISTS palettes_item ON palettes (item_id);
+CREATE TABLE IF NOT EXISTS folders (id TEXT PRIMARY KEY, parent_id TEXT, name TEXT);
+CREATE INDEX IF NOT EXISTS folders_parent ON folders (parent_id);
+CREATE TABLE IF NOT EXISTS missing (id TEXT PRIMARY KEY, mtime INTEGER);
+'''
+
+# searchable text; the trigram tokenizer gives the substring semantics of
+# Eagle's own keyword search (and works for CJK names)
+_TEXT_COLUMNS = ('name', 'annotation', 'tags', 'url', 'text')
+
+_ORDER_COLUMNS = {'CREATEDATE': 'i.btime', 'FILESIZE': 'i.size', 'NAME': 'i.name',
+                  'RESOLUTION': 'i.width * i.height'}
+
+
+class MetadataIndex():
+    """Local SQLite index of item metadata for fast offline queries.
+
+    The index is filled from a `LibraryReader` and kept current with
+    `sync()`, which only re-reads the items whose `mtime.json` entry
+    changed. Queries return the same `_Item` objects as `ITEM.list`.
+
+    Keyword search uses an FTS5 trigram table when the SQLite build has
+    one, and falls back to `LIKE` scans otherwise (and for keywords
+    shorter than three characters).
+
+    Parameters
+    ----------
+    path : str, optional
+        Database file; the default keeps the index in memory.
+    """
+
+    def __init__(self, path: str = ':memory:') -> None:
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        self.fts = self._create_fts()
+        self._decode_list = list_decoder(types._Item)
+
+    def _create_fts(self) -> bool:
+        columns = ', '.join(_TEXT_COLUMNS)
+        try:
+            self._db.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS items_text USING fts5('
+                             f'{columns}, tokenize="trigram")')
+            return True
+        except sqlite3.OperationalError:
+            self._db.execute(f'CREATE TABLE IF NOT EXISTS items_text ('
+                             f'rowid INTEGER PRIMARY KEY, {columns})')
+            return False
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+
+    def __contains__(self, id: str) -> bool:
+        return self._db.execute('SELECT 1 FROM items WHERE id = ?', (id,)).fetchone() is not None
+
+    # === writing ===
+
+    def _meta(self, key: str) -> str | None:
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _delete(self, ids: list[str]) -> None:
+        rows = [(id,) for id in ids]
+        # items_text shares the rowid of items (FTS5 has no index on other columns)
+        self._db.executemany('DELETE FROM items_text WHERE rowid = '
+                             '(SELECT rowid FROM items WHERE id = ?)', rows)
+        for table, column in (('items', 'id'), ('item_tags', 'item_id'),
+                              ('item_folders', 'item_id'), ('palettes', 'item_id'),
+                              ('missing', 'id')):
+            self._db.executemany(f'DELETE FROM {table} WHERE {column} = ?', rows)
+
+    def upsert(self, metadatas: Iterable[dict[str, Any]],
+               mtimes: dict[str, int] | None = None) -> int:
+        """Insert or replace raw item payloads (`metadata.json` / `ITEM.list` data).
+
+        `mtimes` gives the `mtime.json` value stored for each id; without
+        it the item's own `lastModified` / `modificationTime` is used.
+        Returns the number of items written.
+        """
+        count = 0
+        with self._db:
+            for d in metadatas:
+                id = d['id']
+                self._delete([id])
+                mtime = (mtimes.get(id) if mtimes is not None else None)
+                if mtime is None:
+                    mtime = d.get('lastModified', d.get('modificationTime'))
+                tags = d.get('tags') or []
+                rowid = self._db.execute(
+                    'INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (id, mtime, d.get('name'), d.get('ext'), d.get('size'), d.get('btime'),
+                     d.get('width'), d.get('height'), d.get('star'),
+                     int(bool(d.get('isDeleted'))), json.dumps(d, ensure_ascii=False))).lastrowid
+                self._db.execute(
+                    f'INSERT INTO items_text (rowid, {", ".join(_TEXT_COLUMNS)}) '
+                    f'VALUES (?{", ?" * len(_TEXT_COLUMNS)})',
+                    (rowid, d.get('name', ''), d.get('annotation', ''), ' '.join(tags),
+                     d.get('url', ''), d.get('text', '')))
+                self._db.executemany('INSERT INTO item_tags VALUES (?, ?)',
+                                     [(id, t) for t in tags])
+                self._db.executemany('INSERT INTO item_folders VALUES (?, ?)',
+                                     [(id, f) for f in d.get('folders') or ()])
+                self._db.executemany('INSERT INTO palettes VALUES (?, ?, ?, ?, ?)',
+                                     [(id, *p['color'][:3], p.get('ratio'))
+                                      for p in d.get('palettes') or ()])
+                count += 1
+        return count
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._db:
+            self._delete(list(ids))
+
+    def setFolders(self, folders: list[dict[str, Any]]) -> None:
+        """Replace the folder tree (raw `folders` of the library metadata)."""
+        rows = []
+        stack: list[tuple[dict, str | None]] = [(f, None) for f in folders]
+        while stack:
+            folder, parent_id = stack.pop()
+            rows.append((folder['id'], parent_id, folder.get('name')))
+            stack.extend((child, folder['id']) for child in folder.get('children') or ())
+        with self._db:
+            self._db.execute('DELETE FROM folders')
+            self._db.executemany('INSERT INTO folders VALUES (?, ?, ?)', rows)
+
+    def mtimes(self) -> dict[str, int]:
+        """The `mtime.json` state the index was last synced to."""
+        return dict(self._db.execute('SELECT id, mtime FROM items '
+                                     'UNION ALL SELECT id, mtime FROM missing'))
+
+    def sync(self, reader: LibraryReader, batchSize: int = 1000) -> ChangeSet:
+        """Bring the index up to date with the library on disk.
+
+        Only items whose `mtime.json` entry differs from the indexed one
+        are read; the folder tree is reloaded when the library metadata
+        file changed.
+
+        Ids listed in `mtime.json` without a `metadata.json` are kept as
+        tombstones with their mtime, so they are not read again until
+        their entry changes. They are left out of the returned
+        `ChangeSet` (an indexed item that lost its metadata counts as
+        removed).
+        """
+        tombstones = {id for id, in self._db.execute('SELECT id FROM missing')}
+        changes = diff_mtimes(self.mtimes(), reader.mtimes())
+        if changes.removed:
+            self.remove(changes.removed)
+        changed = changes.changed
+        read: set[str] = set()
+
+        def seen(metadatas: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+            for d in metadatas:
+                read.add(d['id'])
+                yield d
+
+        for start in range(0, len(changed), batchSize):
+            self.upsert(seen(reader.iterMetadata(changed[start:start + batchSize])),
+                        changes.mtimes)
+
+        absent = [id for id in changed if id not in read]
+        # an indexed item whose metadata.json disappeared counts as removed
+        lost = [id for id in absent if id not in tombstones and id in self]
+        if absent:
+            with self._db:
+                self._delete(absent)
+                self._db.executemany('INSERT INTO missing VALUES (?, ?)',
+                                     [(id, changes.mtimes[id]) for id in absent])
+        if absent or tombstones:
+            skip = tombstones.union(absent)
+            changes = ChangeSet([id for id in changes.added if id not in skip],
+                                [id for id in changes.modified if id not in skip],
+                                [id for id in changes.removed if id not in tombstones] + lost,
+                                changes.mtimes)
+
+        try:
+            stamp = str(os.stat(os.path.join(reader.libpath, 'metadata.json')).st_mtime_ns)
+        except OSError:
+            stamp = None
+        if stamp is not None and stamp != self._meta('folders_stamp'):
+            self.setFolders(reader.libraryMetadata().get('folders', []))
+            with self._db:
+                self._db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                                 ('folders_stamp', stamp))
+        return changes
+
+    # === queries ===
+
+    def _items(self, rows: Iterable[tuple[str]]) -> list[types._Item]:
+        return self._decode_list([json.loads(data) for data, in rows])
+
+    def get(self, id: str) -> types._Item | None:
+        found = self._items(self._db.execute('SELECT data FROM items WHERE id = ?', (id,)))
+        return found[0] if found else None
+
+    def subfolders(self, folderId: str) -> list[str]:
+        """`folderId` and the ids of every folder below it."""
+        return [id for id, in self._db.execute(
+            'WITH RECURSIVE sub(id) AS (SELECT ? UNION '
+            'SELECT f.id FROM folders f JOIN sub ON f.parent_id = sub.id) '
+            'SELECT id FROM sub', (folderId,))]
+
+    def _keyword_clause(self, word: str) -> tuple[str, list[Any]]:
+        if self.fts and len(word) >= 3:
+            return ('i.rowid IN (SELECT rowid FROM items_text WHERE items_text MATCH ?)',
+                    ['"' + word.replace('"', '""') + '"'])
+        pattern = '%' + word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        likes = ' OR '.join(f"t.{c} LIKE ? ESCAPE '\\'" for c in _TEXT_COLUMNS)
+        return (f'i.rowid IN (SELECT t.rowid FROM items_text t WHERE {likes})',
+                [pattern] * len(_TEXT_COLUMNS))
+
+    def search(self, keyword: str | None = None, *, tags: Iterable[str] = (),
+               anyTags: Iterable[str] = (), folder: str | None = None,
+               subtree: bool = True, ext: str | None = None,
+               includeDeleted: bool = False, orderBy: types.ORDER | None = None,
+               limit: int | None = None, offset: int = 0) -> list[types._Item]:
+        """Query the index.
+
+        Parameters
+        ----------
+        keyword : str | None, optional
+            Whitespace-separated words, each matched as a substring of
+            name / annotation / tags / url / text (all words must match).
+        tags : Iterable[str], optional
+            Items must have every one of these tags.
+        anyTags : Iterable[str], optional
+            Items must have at least one of these tags.
+        folder : str | None, optional
+            Folder id; with `subtree` its descendants are included too.
+        ext : str | None, optional
+        includeDeleted : bool, optional
+            Include items in the trash.
+        orderBy : types.ORDER | None, optional
+            Same values as `ITEM.list`.
+        """
+        where: list[str] = []
+        params: list[Any] = []
+        if keyword:
+            for word in keyword.split():
+                clause, values = self._keyword_clause(word)
+                where.append(clause)
+                params += values
+        tags = list(dict.fromkeys(tags))
+        if tags:
+            where.append(f'i.id IN (SELECT item_id FROM item_tags WHERE tag IN '
+                         f'({", ".join("?" * len(tags))}) '
+                         f'GROUP BY item_id HAVING COUNT(DISTINCT tag) = ?)')
+            params += tags + [len(tags)]
+        anyTags = list(anyTags)
+        if anyTags:
+            where.append(f'i.id IN (SELECT item_id FROM item_tags WHERE tag IN '
+                         f'({", ".join("?" * len(anyTags))}))')
+            params += anyTags
+        if folder is not None:
+            if subtree:
+                where.append('i.id IN (SELECT item_id FROM item_folders WHERE folder_id IN ('
+                             'WITH RECURSIVE sub(id) AS (SELECT ? UNION '
+                             'SELECT f.id FROM folders f JOIN sub ON f.parent_id = sub.id) '
+                             'SELECT id FROM sub))')
+            else:
+                where.append('i.id IN (SELECT item_id FROM item_folders WHERE folder_id = ?)')
+            params.append(folder)
+        if ext is not None:
+            where.append('i.ext = ?')
+            params.append(ext)
+        if not includeDeleted:
+            where.append('i.isDeleted = 0')
+
+        sql = 'SELECT i.data FROM items i'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        if orderBy is not None:
+            column = _ORDER_COLUMNS[orderBy.lstrip('-')]
+            sql += f' ORDER BY {column} {"DESC" if orderBy.startswith("-") else "ASC"}, i.id'
+        elif limit is not None or offset:
+            sql += ' ORDER BY i.rowid'
+        if limit is not None or offset:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [-1 if limit is None else limit, offset]
+        return self._items(self._db.execute(sql, params))
+
+    def iterSearch(self, keyword: str | None = None, *, pageSize: int = 1000,
+                   **filters) -> Iterator[types._Item]:
+        """`search` in pages of `pageSize`, for result sets that are large."""
+        offset = 0
+        while True:
+            page = self.search(keyword, limit=pageSize, offset=offset, **filters)
+            yield from page
+            if len(page) < pageSize:
+                return
+            offset += pageSize
+
+    def tagCounts(self, includeDeleted: bool = False) -> dict[str, int]:
+        sql = 'SELECT t.tag, COUNT(*) FROM item_tags t'
+        if not includeDeleted:
+            sql += ' JOIN items i ON i.id = t.item_id WHERE i.isDeleted = 0'
+        return dict(self._db.execute(sql + ' GROUP BY t.tag'))
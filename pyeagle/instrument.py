@@ -0,0 +1,166 @@
+import bisect
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+if TYPE_CHECKING:
+    from .main import EagleAPI
+
+# upper bounds (seconds) of the latency histogram buckets; the last bucket
+# collects everything slower
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+
+class CallRecord(NamedTuple):
+    method: str
+    endpoint: str
+    seconds: float  # request time, without parsing the response's JSON
+    parseSeconds: float | None
+    requestBytes: int | None
+    responseBytes: int | None
+    status: str | None
+    error: BaseException | None
+
+
+class _EndpointStats():
+    __slots__ = ('count', 'errors', 'seconds', 'maxSeconds', 'histogram',
+                 'parseSeconds', 'requestBytes', 'responseBytes')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.maxSeconds = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.parseSeconds = 0.0
+        self.requestBytes = 0
+        self.responseBytes = 0
+
+    def add(self, record: CallRecord) -> None:
+        self.count += 1
+        if record.error is not None or record.status != 'success':
+            self.errors += 1
+        self.seconds += record.seconds
+        self.maxSeconds = max(self.maxSeconds, record.seconds)
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, record.seconds)] += 1
+        self.parseSeconds += record.parseSeconds or 0.0
+        self.requestBytes += record.requestBytes or 0
+        self.responseBytes += record.responseBytes or 0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS, self.histogram):
+            seen += n
+            if seen >= target:
+                return bound
+        return self.maxSeconds
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'seconds': self.seconds,
+            'meanSeconds': self.seconds / self.count if self.count else 0.0,
+            'maxSeconds': self.maxSeconds,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'histogram': {('inf' if i == len(LATENCY_BUCKETS) else str(LATENCY_BUCKETS[i])): n
+                          for i, n in enumerate(self.histogram)},
+            'parseSeconds': self.parseSeconds,
+            'requestBytes': self.requestBytes,
+            'responseBytes': self.responseBytes,
+        }
+
+
+class Instrumentation():
+    """Per-endpoint timing of `EagleAPI` calls and of response decoding.
+
+    Attach with `EagleAPI(instrumentation=True)` or by assigning
+    `api.instrumentation`; set it back to None to turn it off (the only
+    remaining cost is one attribute check per call).
+
+    Every request is counted per endpoint with its latency (as a
+    histogram, see `LATENCY_BUCKETS`), request body size and response
+    size. When the transport reports it (`PooledTransport` does), JSON
+    parsing of the response is timed separately as `parseSeconds` and
+    left out of the latency. Decoding into `types` classes
+    (`_decode` / `_decode_list`) is recorded per endpoint. `before` hooks
+    run with `(method, endpoint, query)` ahead of each request and
+    `after` hooks with the `CallRecord` once it finished.
+    """
+
+    def __init__(self) -> None:
+        self.before: list[Callable[[str, str, dict], None]] = []
+        self.after: list[Callable[[CallRecord], None]] = []
+        self._lock = threading.Lock()
+        self._endpoints: dict[tuple[str, str], _EndpointStats] = {}
+        self._decode: dict[str, list] = {}
+        self._started = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._decode.clear()
+            self._started = time.time()
+
+    def call(self, api: 'EagleAPI', method: str, endpoint: str,
+             query: dict[str, Any], body: str | None = None) -> dict:
+        for hook in self.before:
+            hook(method, endpoint, query)
+        res: Any = None
+        error = None
+        start = time.perf_counter()
+        try:
+            if method == 'GET':
+                res = api._get(endpoint, query)
+            else:
+                res = api._post(endpoint, body)  # type: ignore
+            return res
+        except BaseException as err:
+            error = err
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            parse = api.transport.lastParseSeconds()
+            record = CallRecord(method, endpoint, elapsed - (parse or 0.0), parse,
+                                None if body is None else len(body),
+                                api.transport.lastResponseSize(),
+                                res.get('status') if isinstance(res, dict) else None,
+                                error)
+            with self._lock:
+                stats = self._endpoints.get((method, endpoint))
+                if stats is None:
+                    stats = self._endpoints[method, endpoint] = _EndpointStats()
+                stats.add(record)
+            for hook in self.after:
+                hook(record)
+
+    def decode(self, endpoint: str | None, cls: type, count: int,
+               func: Callable[[], Any]) -> Any:
+        """Time `func`, decoding `count` records of `cls` from `endpoint`."""
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        # decoding outside a request (no endpoint) is keyed by class
+        key = endpoint or cls.__name__
+        with self._lock:
+            stats = self._decode.get(key)
+            if stats is None:
+                stats = self._decode[key] = [cls.__name__, 0, 0, 0.0]
+            stats[1] += 1
+            stats[2] += count
+            stats[3] += elapsed
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serializable copy of the statistics collected so far."""
+        with self._lock:
+            endpoints = {f'{method} {endpoint}': stats.snapshot()
+                         for (method, endpoint), stats in self._endpoints.items()}
+            decode = {key: {'type': name, 'calls': calls, 'records': records,
+                            'seconds': seconds}
+                      for key, (name, calls, records, seconds) in self._decode.items()}
+        return {'since': self._started, 'endpoints': endpoints, 'decode': decode}
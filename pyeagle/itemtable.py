@@ -0,0 +1,295 @@
+from array import array
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Literal
+
+import numpy as np
+
+from . import types
+from .decoder import decoder
+
+if TYPE_CHECKING:
+    from .main import EagleAPI
+
+# stored in integer columns when Eagle omits the value (width of a font...)
+MISSING = -1
+
+AGG = Literal['count', 'sum', 'mean', 'min', 'max']
+
+
+class _Vocabulary():
+    """Interns strings to dense int codes."""
+    __slots__ = ('values', 'codes')
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _take_ragged(indptr: np.ndarray, values: np.ndarray,
+                 indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    starts = indptr[indices]
+    lengths = indptr[indices + 1] - starts
+    newptr = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=newptr[1:])
+    gather = np.repeat(starts - newptr[:-1], lengths) + np.arange(newptr[-1])
+    return newptr, values[gather]
+
+
+class ItemTable():
+    """Column-oriented item list for vectorized filtering and aggregation.
+
+    Integer attributes are int64 arrays (`MISSING` where Eagle omitted the
+    value), `ext` is an int32 code into `exts`, and `tags` / `folders` are
+    stored CSR-style: interned int32 codes plus an `indptr` offset array.
+    No `_Item` is created until `toItem` / `toItems` is called.
+
+    Columns are read with `table['size']`; boolean masks and index arrays
+    select rows with `table.filter(mask)`.
+    """
+
+    INT_COLUMNS = ('size', 'width', 'height', 'btime', 'mtime',
+                   'modificationTime', 'lastModified', 'star')
+    STR_COLUMNS = ('id', 'name', 'url', 'annotation')
+
+    def __init__(self, columns: dict[str, np.ndarray], exts: list[str],
+                 tags: list[str], tagIndptr: np.ndarray, tagCodes: np.ndarray,
+                 folders: list[str], folderIndptr: np.ndarray,
+                 folderCodes: np.ndarray) -> None:
+        self.columns = columns
+        self.exts = exts
+        self.tags = tags
+        self.tagIndptr = tagIndptr
+        self.tagCodes = tagCodes
+        self.folders = folders
+        self.folderIndptr = folderIndptr
+        self.folderCodes = folderCodes
+
+    # === construction ===
+
+    @classmethod
+    def fromPages(cls, pages: Iterable[list[dict]]) -> 'ItemTable':
+        """Build a table from raw `/item/list` pages (see `ITEM.pages`)."""
+        ints = {c: array('q') for c in cls.INT_COLUMNS}
+        strs: dict[str, list[str]] = {c: [] for c in cls.STR_COLUMNS}
+        deleted = array('b')
+        exts, tags, folders = _Vocabulary(), _Vocabulary(), _Vocabulary()
+        extCodes, tagCodes, folderCodes = array('i'), array('i'), array('i')
+        tagIndptr, folderIndptr = array('q', [0]), array('q', [0])
+
+        for page in pages:
+            for d in page:
+                get = d.get
+                for c, column in ints.items():
+                    v = get(c)
+                    column.append(MISSING if v is None else int(v))
+                for c, values in strs.items():
+                    values.append(get(c, ''))
+                deleted.append(bool(get('isDeleted', False)))
+                extCodes.append(exts.code(get('ext', '')))
+                tagCodes.extend(map(tags.code, get('tags') or ()))
+                tagIndptr.append(len(tagCodes))
+                folderCodes.extend(map(folders.code, get('folders') or ()))
+                folderIndptr.append(len(folderCodes))
+
+        columns: dict[str, np.ndarray] = {c: np.frombuffer(v, dtype=np.int64)
+                                          for c, v in ints.items()}
+        for c, values in strs.items():
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            columns[c] = column
+        columns['ext'] = np.frombuffer(extCodes, dtype=np.int32)
+        columns['isDeleted'] = np.frombuffer(deleted, dtype=np.int8).astype(bool)
+
+        return cls(columns, exts.values,
+                   tags.values, np.frombuffer(tagIndptr, dtype=np.int64),
+                   np.frombuffer(tagCodes, dtype=np.int32),
+                   folders.values, np.frombuffer(folderIndptr, dtype=np.int64),
+                   np.frombuffer(folderCodes, dtype=np.int32))
+
+    @classmethod
+    def fromAPI(cls, api: 'EagleAPI', *, keyword: str | None = None,
+                ext: str | None = None, orderBy: types.ORDER | None = None,
+                tags: list[str] = [], folders: list[str] = [],
+                pageSize: int = 1000) -> 'ItemTable':
+        """Load every item matching the `ITEM.list` filters, page by page."""
+        return cls.fromPages(api.ITEM.pages(keyword=keyword, ext=ext, orderBy=orderBy,
+                                            tags=tags, folders=folders,
+                                            pageSize=pageSize))
+
+    # === access ===
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __repr__(self) -> str:
+        return f'<ItemTable {len(self)} items, {len(self.tags)} tags, {len(self.folders)} folders>'
+
+    def _rows(self, indptr: np.ndarray) -> np.ndarray:
+        """Row number of every entry of a CSR column."""
+        return np.repeat(np.arange(len(self)), np.diff(indptr))
+
+    def _ragged(self, name: Literal['tags', 'folders']) -> tuple[np.ndarray, np.ndarray, list[str]]:
+        if name == 'tags':
+            return self.tagIndptr, self.tagCodes, self.tags
+        elif name == 'folders':
+            return self.folderIndptr, self.folderCodes, self.folders
+        raise KeyError(name)
+
+    # === masks ===
+
+    def _contains(self, name: Literal['tags', 'folders'], wanted: Iterable[str],
+                  every: bool) -> np.ndarray:
+        indptr, codes, vocab = self._ragged(name)
+        lookup = {v: i for i, v in enumerate(vocab)}
+        wantedCodes = {lookup.get(v, -1) for v in wanted}
+        if every and -1 in wantedCodes:
+            return np.zeros(len(self), dtype=bool)
+        wantedCodes.discard(-1)
+
+        hit = np.isin(codes, np.fromiter(wantedCodes, dtype=np.int32, count=len(wantedCodes)))
+        rows = self._rows(indptr)[hit]
+        if not every:
+            mask = np.zeros(len(self), dtype=bool)
+            mask[rows] = True
+            return mask
+        pairs = np.unique(rows.astype(np.int64) * len(vocab) + codes[hit])
+        return np.bincount(pairs // max(len(vocab), 1), minlength=len(self)) == len(wantedCodes)
+
+    def hasTag(self, tag: str) -> np.ndarray:
+        return self._contains('tags', [tag], True)
+
+    def hasAllTags(self, tags: Iterable[str]) -> np.ndarray:
+        return self._contains('tags', tags, True)
+
+    def hasAnyTag(self, tags: Iterable[str]) -> np.ndarray:
+        return self._contains('tags', tags, False)
+
+    def inFolder(self, folderId: str) -> np.ndarray:
+        return self._contains('folders', [folderId], True)
+
+    def inAnyFolder(self, folderIds: Iterable[str]) -> np.ndarray:
+        return self._contains('folders', folderIds, False)
+
+    def extIn(self, *exts: str) -> np.ndarray:
+        codes = [i for i, e in enumerate(self.exts) if e in exts]
+        return np.isin(self.columns['ext'], codes)
+
+    # === selection ===
+
+    def filter(self, rows: np.ndarray | list[int]) -> 'ItemTable':
+        """Return the rows selected by a boolean mask or an index array."""
+        indices = np.asarray(rows)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        indices = indices.astype(np.int64, copy=False)
+        tagIndptr, tagCodes = _take_ragged(self.tagIndptr, self.tagCodes, indices)
+        folderIndptr, folderCodes = _take_ragged(self.folderIndptr, self.folderCodes, indices)
+        return ItemTable({c: v[indices] for c, v in self.columns.items()}, self.exts,
+                         self.tags, tagIndptr, tagCodes,
+                         self.folders, folderIndptr, folderCodes)
+
+    def sort(self, by: str, descending: bool = False) -> 'ItemTable':
+        order = np.argsort(self.columns[by], kind='stable')
+        if descending:
+            order = order[::-1]
+        return self.filter(order)
+
+    def topK(self, by: str, k: int, largest: bool = True) -> 'ItemTable':
+        """The `k` rows with the largest (or smallest) `by`, in order."""
+        column = self.columns[by]
+        k = min(k, len(self))
+        if k <= 0:
+            return self.filter(np.zeros(0, dtype=np.int64))
+        keys = -column if largest else column
+        part = np.argpartition(keys, k - 1)[:k]
+        return self.filter(part[np.argsort(keys[part], kind='stable')])
+
+    # === aggregation ===
+
+    def groupBy(self, key: str, value: str | None = None,
+                agg: AGG = 'count') -> tuple[np.ndarray, np.ndarray]:
+        """Aggregate `value` per distinct `key`.
+
+        `key` is any column, `'ext'`, `'tags'` or `'folders'` (an item then
+        counts once for each of its tags / folders). `MISSING` values are
+        ignored by sum / mean / min / max.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Group labels and aggregated values.
+        """
+        if key in ('tags', 'folders'):
+            indptr, group, vocab = self._ragged(key)  # type: ignore
+            labels = np.asarray(vocab, dtype=object)
+            rows = self._rows(indptr)
+        elif key == 'ext':
+            group = self.columns['ext']
+            labels = np.asarray(self.exts, dtype=object)
+            rows = np.arange(len(self))
+        else:
+            labels, group = np.unique(self.columns[key], return_inverse=True)
+            rows = np.arange(len(self))
+
+        nkeys = len(labels)
+        present = np.bincount(group, minlength=nkeys) > 0
+        if agg == 'count' or value is None:
+            return labels[present], np.bincount(group, minlength=nkeys)[present]
+
+        values = self.columns[value][rows]
+        valid = values != MISSING
+        group, values = group[valid], values[valid]
+        counts = np.bincount(group, minlength=nkeys)
+        if agg in ('sum', 'mean'):
+            result = np.zeros(nkeys, dtype=values.dtype)
+            np.add.at(result, group, values)
+            if agg == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result = result / counts
+        elif agg in ('min', 'max'):
+            info = np.iinfo(values.dtype)
+            if agg == 'max':
+                result = np.full(nkeys, info.min, dtype=values.dtype)
+                np.maximum.at(result, group, values)
+            else:
+                result = np.full(nkeys, info.max, dtype=values.dtype)
+                np.minimum.at(result, group, values)
+            result[counts == 0] = MISSING
+        else:
+            raise ValueError(f'unknown aggregation {agg!r}')
+        return labels[present], result[present]
+
+    # === conversion ===
+
+    def toDict(self, row: int) -> dict[str, Any]:
+        """Rebuild the `/item/list` payload of one row (palettes are not kept)."""
+        c = self.columns
+        d: dict[str, Any] = {k: c[k][row] for k in self.STR_COLUMNS}
+        for k in self.INT_COLUMNS:
+            v = int(c[k][row])
+            if v != MISSING:
+                d[k] = v
+        d['ext'] = self.exts[c['ext'][row]]
+        d['isDeleted'] = bool(c['isDeleted'][row])
+        t0, t1 = self.tagIndptr[row], self.tagIndptr[row + 1]
+        d['tags'] = [self.tags[i] for i in self.tagCodes[t0:t1]]
+        f0, f1 = self.folderIndptr[row], self.folderIndptr[row + 1]
+        d['folders'] = [self.folders[i] for i in self.folderCodes[f0:f1]]
+        return d
+
+    def toItem(self, row: int) -> types._Item:
+        return decoder(types._Item)(self.toDict(row))
+
+    def toItems(self) -> Iterator[types._Item]:
+        decode_item = decoder(types._Item)
+        for row in range(len(self)):
+            yield decode_item(self.toDict(row))
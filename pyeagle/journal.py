@@ -0,0 +1,252 @@
+import json
+import os
+import shutil
+import uuid
+from typing import Any
+
+from .library import write_json
+
+LOCK_NAME = '.pyeagle.lock'
+JOURNAL_NAME = '.pyeagle-journal'
+_MANIFEST = 'manifest.jsonl'
+_COMMITTED = 'COMMITTED'
+
+
+def would_overwrite(src: str, dst: str) -> bool:
+    """Whether renaming `src` to `dst` would replace another file.
+
+    On case-insensitive filesystems a case-only rename (`Foo` -> `foo`)
+    finds `dst` already there, but it is `src` itself.
+    """
+    if not os.path.exists(dst):
+        return False
+    try:
+        return not os.path.samefile(src, dst)
+    except FileNotFoundError:
+        return True
+
+
+class LibraryLock():
+    """Exclusive, blocking file lock serializing writers of one library.
+
+    Held through `fcntl.flock` on POSIX and `msvcrt.locking` on Windows, so
+    it also excludes other processes (and other `LibraryLock` objects in
+    this process).
+    """
+
+    def __init__(self, libpath: str) -> None:
+        self.path = os.path.join(libpath, LOCK_NAME)
+        self._fd: int | None = None
+
+    def acquire(self) -> None:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after ~10 s; keep waiting
+                        continue
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class Transaction():
+    """Journaled, all-or-nothing edits of files in an Eagle library.
+
+    Before a file is changed its current version is copied (streamed, so
+    memory use does not depend on the file size) into a journal directory
+    under the library, and every step is logged to a manifest. Writes
+    themselves go to a temporary file that is renamed over the original.
+
+    Leaving the `with` block normally commits and removes the journal; an
+    exception rolls every step back. A journal left behind by a crashed
+    process is rolled back by `recover()`, which runs whenever the next
+    transaction starts. Transactions on the same library are serialized
+    with a `LibraryLock`.
+
+    Parameters
+    ----------
+    libpath : str
+        The `.library` directory.
+    durable : bool, optional
+        fsync backups and the manifest, so recovery also survives an OS
+        crash or power loss (slower).
+    """
+
+    def __init__(self, libpath: str, durable: bool = False) -> None:
+        self.libpath = libpath
+        self.durable = durable
+        self.journalDir = os.path.join(libpath, JOURNAL_NAME)
+        self._lock = LibraryLock(libpath)
+        self._dir: str | None = None
+        self._manifest = None
+        self._protected: set[str] = set()
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            recover(self.libpath)
+            self._dir = os.path.join(self.journalDir, uuid.uuid4().hex)
+            os.makedirs(self._dir)
+            self._manifest = open(os.path.join(self._dir, _MANIFEST), 'a', encoding='utf-8')
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self._lock.release()
+
+    def _log(self, entry: dict[str, Any]) -> None:
+        if self._manifest is None:
+            raise RuntimeError('transaction is not active')
+        self._manifest.write(json.dumps(entry) + '\n')
+        self._manifest.flush()
+        if self.durable:
+            os.fsync(self._manifest.fileno())
+
+    def protect(self, path: str) -> None:
+        """Journal the current state of `path` before it is first modified."""
+        path = os.path.abspath(path)
+        if path in self._protected:
+            return
+        backup = None
+        if os.path.exists(path):
+            backup = os.path.join(self._dir, f'{len(self._protected)}.bak')  # type: ignore
+            shutil.copy2(path, backup)
+            if self.durable:
+                with open(backup, 'rb') as f:
+                    os.fsync(f.fileno())
+        self._log({'op': 'file', 'path': path, 'backup': backup})
+        self._protected.add(path)
+
+    def write_json(self, path: str, data: Any, ensure_ascii: bool = True) -> None:
+        self.protect(path)
+        write_json(path, data, ensure_ascii)
+
+    def write_bytes(self, path: str, data: bytes) -> None:
+        self.protect(path)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def rename(self, src: str, dst: str) -> None:
+        """Rename `src` to `dst` (which must not exist)."""
+        src, dst = os.path.abspath(src), os.path.abspath(dst)
+        if would_overwrite(src, dst):
+            raise FileExistsError(f'{dst} already exists')
+        self._log({'op': 'rename', 'src': src, 'dst': dst})
+        os.rename(src, dst)
+
+    def _close(self) -> None:
+        if self._manifest is not None:
+            self._manifest.close()
+            self._manifest = None
+
+    def commit(self) -> None:
+        self._close()
+        if self._dir is None:
+            return
+        open(os.path.join(self._dir, _COMMITTED), 'w').close()
+        shutil.rmtree(self._dir, ignore_errors=True)
+        self._dir = None
+
+    def rollback(self) -> None:
+        self._close()
+        if self._dir is None:
+            return
+        _rollback(self._dir)
+        self._dir = None
+
+
+def _rollback(journal: str) -> None:
+    entries = []
+    try:
+        with open(os.path.join(journal, _MANIFEST), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # torn last line: the step it describes never ran
+                    break
+    except FileNotFoundError:
+        pass
+
+    # every step is idempotent and backups are kept until the whole
+    # manifest has been replayed, so a rollback interrupted by another
+    # crash can simply be run again
+    for entry in reversed(entries):
+        if entry['op'] == 'rename':
+            if os.path.exists(entry['dst']) and not would_overwrite(entry['dst'], entry['src']):
+                os.rename(entry['dst'], entry['src'])
+        elif entry['backup'] is not None:
+            if not os.path.exists(entry['backup']):
+                # protect() writes the entry only after the copy exists, so a
+                # missing backup was already consumed; skip it so recovery
+                # can always finish
+                continue
+            tmp = f'{entry["path"]}.{os.getpid()}.tmp'
+            shutil.copy2(entry['backup'], tmp)
+            os.replace(tmp, entry['path'])
+        elif os.path.exists(entry['path']):
+            os.remove(entry['path'])
+    shutil.rmtree(journal, ignore_errors=True)
+
+
+def recover(libpath: str) -> int:
+    """Roll back transactions left unfinished by a crashed process.
+
+    Must be called with the library lock held (`Transaction` does).
+    Returns the number of transactions rolled back.
+    """
+    root = os.path.join(libpath, JOURNAL_NAME)
+    try:
+        journals = [e.path for e in os.scandir(root) if e.is_dir()]
+    except FileNotFoundError:
+        return 0
+    rolled_back = 0
+    for journal in journals:
+        if os.path.exists(os.path.join(journal, _COMMITTED)):
+            shutil.rmtree(journal, ignore_errors=True)
+        else:
+            _rollback(journal)
+            rolled_back += 1
+    return rolled_back
@@ -0,0 +1,279 @@
+import collections
+import itertools
+import json
+import os
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, NamedTuple
+
+from . import types
+from .decoder import decoder
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .main import EagleAPI
+
+
+def open_json(path: str, limit: int = 30, sleep: float = 0.1) -> Any:
+    """Load a JSON file that Eagle may be rewriting at the same time.
+
+    A truncated file raises `JSONDecodeError`; the read is retried up to
+    `limit` times, `sleep` seconds apart.
+    """
+    for attempt in range(limit):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError as err:
+            error = err
+            if attempt + 1 < limit:
+                time.sleep(sleep)
+    raise error
+
+
+def write_json(path: str, data: Any, ensure_ascii: bool = True) -> None:
+    """Write `data` to a temporary file next to `path`, then swap it in."""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=ensure_ascii)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _ordered_chunks(pool: 'Executor', func: Callable[[list], list], jobs: Iterable,
+                    chunksize: int, window: int) -> Iterator:
+    """`pool.map` over chunks of `jobs`, in order, with at most `window` chunks in flight."""
+    pending: collections.deque = collections.deque()
+    it = iter(jobs)
+    while chunk := list(itertools.islice(it, chunksize)):
+        pending.append(pool.submit(func, chunk))
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+class LibraryReader():
+    """Read item metadata straight from a `.library` directory.
+
+    No HTTP request is made, so this also works on a copied library with
+    no Eagle process running. Eagle keeps one `images/<id>.info/` folder
+    per item with its `metadata.json`, plus `mtime.json` (id -> last
+    modification) and the library `metadata.json` (folders, smart folders...)
+    at the top level.
+
+    Parameters
+    ----------
+    libpath : str
+        Path of the `.library` directory.
+    workers : int | None, optional
+        Threads used by the bulk readers (the executor's default when None).
+    lazy : bool, optional
+        Decode nested records on first access, as `EagleAPI(lazy=True)`.
+    """
+
+    def __init__(self, libpath: str, *, workers: int | None = None,
+                 lazy: bool = False) -> None:
+        self.libpath = libpath
+        self.workers = workers
+        self.lazy = lazy
+
+    @classmethod
+    def fromAPI(cls, api: 'EagleAPI', **kwargs) -> 'LibraryReader':
+        """Reader over the library currently opened in Eagle."""
+        return cls(api.__libpath__, lazy=api.lazy, **kwargs)
+
+    # === paths ===
+
+    @property
+    def imagesDir(self) -> str:
+        return os.path.join(self.libpath, 'images')
+
+    def itemDir(self, id: str) -> str:
+        return os.path.join(self.libpath, 'images', id + '.info')
+
+    def metadataPath(self, id: str) -> str:
+        return os.path.join(self.libpath, 'images', id + '.info', 'metadata.json')
+
+    def filePath(self, item: types._Item | dict) -> str:
+        if isinstance(item, dict):
+            id, name, ext = item['id'], item['name'], item['ext']
+        else:
+            id, name, ext = item.id, item.name, item.ext
+        return os.path.join(self.itemDir(id), f'{name}.{ext}')
+
+    def thumbnailPath(self, item: types._Item | dict) -> str:
+        if isinstance(item, dict):
+            id, name = item['id'], item['name']
+        else:
+            id, name = item.id, item.name
+        return os.path.join(self.itemDir(id), f'{name}_thumbnail.png')
+
+    # === library files ===
+
+    def libraryMetadata(self) -> dict[str, Any]:
+        """The library `metadata.json` (folders, smartFolders, tagsGroups...)."""
+        return open_json(os.path.join(self.libpath, 'metadata.json'))
+
+    def mtimes(self) -> dict[str, int]:
+        """`mtime.json`: item id -> last modification time (ms)."""
+        data = open_json(os.path.join(self.libpath, 'mtime.json'))
+        return {k: v for k, v in data.items() if k != 'all'}
+
+    def ids(self) -> list[str]:
+        """Ids of every item folder under `images/`, in name order."""
+        with os.scandir(self.imagesDir) as it:
+            return sorted(e.name[:-5] for e in it
+                          if e.name.endswith('.info') and e.is_dir())
+
+    # === items ===
+
+    def metadata(self, id: str) -> dict[str, Any]:
+        return open_json(self.metadataPath(id))
+
+    def item(self, id: str) -> types._Item:
+        return decoder(types._Item, self.lazy)(self.metadata(id))
+
+    def _read_chunk(self, ids: list[str]) -> list[dict[str, Any]]:
+        result = []
+        for id in ids:
+            try:
+                result.append(self.metadata(id))
+            except FileNotFoundError:
+                # removed (or not yet written) while the library was scanned
+                pass
+        return result
+
+    def iterMetadata(self, ids: Iterable[str] | None = None, *,
+                     chunksize: int = 256) -> Iterator[dict[str, Any]]:
+        """Raw `metadata.json` of `ids` (every item when None), in order.
+
+        Items whose metadata disappears during the scan are skipped.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        if ids is None:
+            ids = self.ids()
+        # a bounded window keeps a slow consumer from piling up read chunks
+        window = 2 * (self.workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix='pyeagle-library') as pool:
+            yield from _ordered_chunks(pool, self._read_chunk, ids, chunksize, window)
+
+    def iterItems(self, ids: Iterable[str] | None = None, *,
+                  includeDeleted: bool = True,
+                  chunksize: int = 256) -> Iterator[types._Item]:
+        decode_item = decoder(types._Item, self.lazy)
+        for metadata in self.iterMetadata(ids, chunksize=chunksize):
+            if includeDeleted or not metadata.get('isDeleted', False):
+                yield decode_item(metadata)
+
+    def items(self, ids: Iterable[str] | None = None, *,
+              includeDeleted: bool = True,
+              chunksize: int = 256) -> list[types._Item]:
+        return list(self.iterItems(ids, includeDeleted=includeDeleted,
+                                   chunksize=chunksize))
+
+
+class ChangeSet(NamedTuple):
+    added: list[str]
+    modified: list[str]
+    removed: list[str]
+    mtimes: dict[str, int]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+    @property
+    def changed(self) -> list[str]:
+        """Added and modified ids, i.e. the ones worth hydrating."""
+        return self.added + self.modified
+
+
+def diff_mtimes(old: dict[str, int], new: dict[str, int]) -> ChangeSet:
+    """Ids added, modified and removed between two `mtime.json` snapshots."""
+    added, modified = [], []
+    for id, mtime in new.items():
+        before = old.get(id)
+        if before is None:
+            added.append(id)
+        elif before != mtime:
+            modified.append(id)
+    removed = [id for id in old if id not in new]
+    return ChangeSet(added, modified, removed, new)
+
+
+class ChangeFeed():
+    """Incremental change detection driven by the library's `mtime.json`.
+
+    The last seen `mtime.json` is kept as a snapshot (in `snapshotPath`
+    when given, otherwise in memory). `poll()` diffs the current file
+    against it, so a sync only touches the items that changed: poll with
+    `commit=False`, `hydrate()` the changed ids, then `commit()`.
+    """
+
+    def __init__(self, reader: LibraryReader, snapshotPath: str | None = None) -> None:
+        self.reader = reader
+        self.snapshotPath = snapshotPath
+        self._snapshot: dict[str, int] | None = None
+
+    @classmethod
+    def fromAPI(cls, api: 'EagleAPI', snapshotPath: str | None = None) -> 'ChangeFeed':
+        return cls(LibraryReader.fromAPI(api), snapshotPath)
+
+    @property
+    def snapshot(self) -> dict[str, int]:
+        if self._snapshot is None:
+            if self.snapshotPath is not None and os.path.exists(self.snapshotPath):
+                self._snapshot = open_json(self.snapshotPath)['mtimes']
+            else:
+                self._snapshot = {}
+        return self._snapshot
+
+    def diff(self, mtimes: dict[str, int] | None = None) -> ChangeSet:
+        """Compare `mtimes` (the current `mtime.json` when None) with the snapshot."""
+        if mtimes is None:
+            mtimes = self.reader.mtimes()
+        return diff_mtimes(self.snapshot, mtimes)
+
+    def commit(self, changes: ChangeSet) -> None:
+        """Make `changes` the new snapshot (written atomically)."""
+        self._snapshot = changes.mtimes
+        if self.snapshotPath is None:
+            return
+        write_json(self.snapshotPath, {'mtimes': changes.mtimes})
+
+    def poll(self, commit: bool = True) -> ChangeSet:
+        """Diff against the snapshot and, by default, advance the snapshot.
+
+        Pass `commit=False` and call `commit()` once the changes have been
+        processed, so a failed sync sees the same changes next time.
+        """
+        changes = self.diff()
+        if commit:
+            self.commit(changes)
+        return changes
+
+    def hydrate(self, ids: Iterable[str], *, api: 'EagleAPI | None' = None,
+                batchSize: int = 256) -> Iterator[list[types._Item]]:
+        """Load `ids` as `_Item`, `batchSize` at a time.
+
+        Items are read from disk, or through `ITEM.info` when `api` is
+        given (requests of a batch run concurrently). Ids that no longer
+        exist are skipped.
+        """
+        it = iter(ids)
+        if api is None:
+            while batch := list(itertools.islice(it, batchSize)):
+                yield self.reader.items(batch)
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.reader.workers,
+                                thread_name_prefix='pyeagle-changefeed') as pool:
+            while batch := list(itertools.islice(it, batchSize)):
+                yield [item for item in pool.map(api.ITEM.info, batch)
+                       if isinstance(item, types._Item)]
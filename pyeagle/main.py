@@ -1,36 +1,99 @@
 import json
-from typing import Any, Literal, overload
-
-import requests
+from typing import Any, Iterator, Literal, overload
 
 from . import types
+from .cache import ResponseCache
+from .decoder import decode, decode_list, decoder
+from .instrument import Instrumentation
+from .transport import PooledTransport, Transport
 from .utility import Utility
 
 
 class EagleAPI():
-    def __init__(self, url='http://localhost:41595') -> None:
+    def __init__(self, url='http://localhost:41595', *,
+                 transport: Transport | None = None,
+                 lazy: bool = False,
+                 cache: ResponseCache | bool = False,
+                 instrumentation: Instrumentation | bool = False) -> None:
         self.eagle_host = url
+        self.lazy = lazy
+        self.transport = transport if transport is not None else PooledTransport()
+        # opt-in TTL cache of read endpoints, see `ResponseCache`
+        self.cache: ResponseCache | None = (ResponseCache() if cache is True
+                                            else cache or None)
+        # opt-in timing of requests and decoding, see `Instrumentation`
+        self.instrumentation: Instrumentation | None = (
+            Instrumentation() if instrumentation is True else instrumentation or None)
         self.APPLICATION = _API_APPLICATION(self)
         self.FOLDER = _API_FOLDER(self)
         self.ITEM = _API_ITEM(self)
         self.LIBRARY = _API_LIBRARY(self)
         self.util = Utility(self)
+        self._libpath: str | None = None
+
+    @property
+    def __libpath__(self) -> str:
+        """Path of the open library, fetched on first use."""
+        if self._libpath is None:
+            self._get_libpath()
+        return self._libpath  # type: ignore
 
-        self._get_libpath()
-    
     def _get_libpath(self):
-        self.__libpath__ = self.LIBRARY.info().library.path  # type: ignore
+        # read the path from the raw payload; decoding the whole folder tree
+        # just for it is what made construction slow
+        res = self.get('/library/info')
+        if res['status'] != 'success':
+            raise RuntimeError(f'Failed to get library info: {res}')
+        self._libpath = res['data']['library']['path']
 
     def get(self, _url: str, **query) -> dict:
-        if not _url.startswith('https://'):
-            _url = self.eagle_host + '/api' + _url
-        return requests.get(_url, params=query).json()
+        if self.instrumentation is not None:
+            return self.instrumentation.call(self, 'GET', _url, query)
+        return self._get(_url, query)
 
     def post(self, _url: str, **query) -> dict:
-        if not _url.startswith('https://'):
-            _url = self.eagle_host + '/api' + _url
-        return requests.post(_url, data=json.dumps(query, cls=types.EagleJSONEncoder)).json()
-    
+        body = json.dumps(query, cls=types.EagleJSONEncoder)
+        if self.instrumentation is not None:
+            return self.instrumentation.call(self, 'POST', _url, query, body)
+        return self._post(_url, body)
+
+    def _get(self, _url: str, query: dict[str, Any]) -> dict:
+        if _url.startswith('https://'):
+            return self.transport.get(_url, query)
+        if self.cache is not None:
+            return self.cache.get(_url, query, lambda: self.transport.get(
+                self.eagle_host + '/api' + _url, query))
+        return self.transport.get(self.eagle_host + '/api' + _url, query)
+
+    def _post(self, _url: str, body: str) -> dict:
+        if _url.startswith('https://'):
+            return self.transport.post(_url, body)
+        res = self.transport.post(self.eagle_host + '/api' + _url, body)
+        if self.cache is not None:
+            self.cache.invalidateFor(_url, res)
+        return res
+
+    def _decode(self, cls, data: dict, endpoint: str | None = None):
+        if self.instrumentation is not None:
+            return self.instrumentation.decode(endpoint, cls, 1,
+                                               lambda: decode(cls, data, self.lazy))
+        return decode(cls, data, self.lazy)
+
+    def _decode_list(self, cls, data: list[dict], endpoint: str | None = None):
+        if self.instrumentation is not None:
+            return self.instrumentation.decode(endpoint, cls, len(data),
+                                               lambda: decode_list(cls, data, self.lazy))
+        return decode_list(cls, data, self.lazy)
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 class _CHILD_API():
     def __init__(self, api: EagleAPI) -> None:
@@ -40,19 +103,21 @@ class _CHILD_API():
 class _API_APPLICATION(_CHILD_API):
     def info(self):
         res = self._api.get('/application/info')
-        return (types._ApplicationInfo(**res['data'])
+        return (self._api._decode(types._ApplicationInfo, res['data'], '/application/info')
                 if res['status'] == 'success' else res)
 
 
 class _API_FOLDER(_CHILD_API):
     def create(self, folderName: str, parent: str | None = None):
         res = self._api.post('/folder/create', folderName=folderName, parent=parent)
-        return (types._NewFolder(**res['data'])
+        self._api.util.invalidateFolderIndex()
+        return (self._api._decode(types._NewFolder, res['data'], '/folder/create')
                 if res['status'] == 'success' else res)
         
     def rename(self, folderId: str, newName: str):
         res = self._api.post('/folder/rename', folderId=folderId, newName=newName)
-        return (types._Folder(**res['data'])
+        self._api.util.invalidateFolderIndex()
+        return (self._api._decode(types._Folder, res['data'], '/folder/rename')
                 if res['status'] == 'success' else res)
         
     def update(self, folderId: str, newName: str | None = None,
@@ -60,12 +125,13 @@ class _API_FOLDER(_CHILD_API):
                newColor: types.COLOR | None = None):
         res = self._api.post('/folder/update', folderId=folderId, newName=newName,
                              newDescription=newDescription, newColor=newColor)
-        return (types._Folder(**res['data'])
+        self._api.util.invalidateFolderIndex()
+        return (self._api._decode(types._Folder, res['data'], '/folder/update')
                 if res['status'] == 'success' else res)
         
     def listRecent(self) -> list[types._Folder] | dict:
         res = self._api.get('/folder/listRecent')
-        return (types.maplist(res['data'], types._Folder)
+        return (self._api._decode_list(types._Folder, res['data'], '/folder/listRecent')
                 if res['status'] == 'success' else res)
     
     _list = list
@@ -78,7 +144,7 @@ class _API_FOLDER(_CHILD_API):
     def list(self, raw=False) -> Any:
         res = self._api.get('/folder/list')
         if not raw:
-            return (types.maplist(res['data'], types._Folder)
+            return (self._api._decode_list(types._Folder, res['data'], '/folder/list')
                     if res['status'] == 'success' else res)
         else:
             return res['data']
@@ -126,7 +192,7 @@ class _API_ITEM(_CHILD_API):
 
     def info(self, id: str):
         res = self._api.get('/item/info', id=id)
-        return (types._Item(**res['data'])
+        return (self._api._decode(types._Item, res['data'], '/item/info')
                 if res['status'] == 'success' else res)
 
     def thumbnail(self, id: str) -> str | dict:
@@ -147,26 +213,95 @@ class _API_ITEM(_CHILD_API):
 
     def update(self, id: str, *, tags: list[str] | None = None,
                annotation: str | None = None, url: str | None = None,
-               star: Literal[0, 1, 2, 3, 4, 5] | None = None):
+               star: Literal[0, 1, 2, 3, 4, 5] | None = None,
+               raw: bool = False):
         res = self._api.post('/item/update', id=id, tags=tags,
                              annotation=annotation, url=url, star=star)
-        return (types._Item(**res['data'])
+        if raw:
+            # skip decoding the updated item; the caller checks res['status']
+            return res
+        return (self._api._decode(types._Item, res['data'], '/item/update')
                 if res['status'] == 'success' else res)
 
+    def pages(self, *, keyword: str | None = None, ext: str | None = None,
+              orderBy: types.ORDER | None = None,
+              tags: list[str] = [], folders: list[str] = [],
+              pageSize: int = 200, prefetch: bool = True) -> Iterator[list[dict]]:
+        """Iterate over raw `/item/list` pages (lists of undecoded dicts).
+
+        While the caller consumes a page, the next one is fetched on a
+        background thread (`prefetch=True`). At most two raw pages are held
+        at once, so memory stays constant regardless of library size.
+
+        Parameters
+        ----------
+        pageSize : int, optional
+            `limit` sent per request.
+        prefetch : bool, optional
+            Fetch the next page in the background.
+
+        Raises
+        ------
+        RuntimeError
+            If Eagle returns an error for a page.
+        """
+        def fetch(page: int) -> list[dict]:
+            # Eagle treats `offset` as a page index, not an item offset.
+            res = self._api.get('/item/list', keyword=keyword, ext=ext,
+                                orderBy=orderBy, limit=pageSize, offset=page,
+                                tags=','.join(tags), folders=','.join(folders))
+            if res['status'] != 'success':
+                raise RuntimeError(f'Failed to list page {page}: {res}')
+            return res['data']
+
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            page = 0
+            pending = executor.submit(fetch, page) if executor is not None else None
+            while True:
+                data = pending.result() if pending is not None else fetch(page)
+                page += 1
+                last = len(data) < pageSize
+                pending = (executor.submit(fetch, page)
+                           if executor is not None and not last else None)
+                yield data
+                if last:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter(self, *, keyword: str | None = None, ext: str | None = None,
+             orderBy: types.ORDER | None = None,
+             tags: list[str] = [], folders: list[str] = [],
+             pageSize: int = 200, prefetch: bool = True) -> Iterator[types._Item]:
+        """Iterate over every matching item, decoding one page at a time.
+
+        Takes the same filters as `list`; see `pages` for paging and
+        prefetch behaviour.
+        """
+        decode_item = decoder(types._Item, self._api.lazy)
+        for data in self.pages(keyword=keyword, ext=ext, orderBy=orderBy,
+                               tags=tags, folders=folders,
+                               pageSize=pageSize, prefetch=prefetch):
+            for raw in data:
+                yield decode_item(raw)
+
     def list(self, limit: int, *, keyword: str | None = None, ext: str | None = None,
              orderBy: types.ORDER | None = None, offset: int = 0,
              tags: list[str] = [], folders: list[str] = []) -> list[types._Item] | dict:
         res = self._api.get('/item/list', keyword=keyword, ext=ext,
                             orderBy=orderBy, limit=limit, offset=offset,
                             tags=','.join(tags), folders=','.join(folders))
-        return (types.maplist(res['data'], types._Item)
+        return (self._api._decode_list(types._Item, res['data'], '/item/list')
                 if res['status'] == 'success' else res)
 
 
 class _API_LIBRARY(_CHILD_API):
     def info(self):
         res = self._api.get('/library/info')
-        return (types._LibraryInfo(**res['data'])
+        return (self._api._decode(types._LibraryInfo, res['data'], '/library/info')
                 if res['status'] == 'success' else res)
 
     def history(self):
@@ -175,5 +310,5 @@ class _API_LIBRARY(_CHILD_API):
 
     def switch(self, libraryPath: str):
         res = self._api.post('/library/switch', libraryPath=libraryPath)
-        self._api._get_libpath()
+        self._api._libpath = None
         return res
@@ -0,0 +1,129 @@
+import collections
+import os
+import threading
+from typing import TYPE_CHECKING, Iterable
+
+from . import types
+from .library import LibraryReader
+from .types import UNDEFINED
+
+if TYPE_CHECKING:
+    from .main import EagleAPI
+
+
+class ThumbnailCache():
+    """Resolve thumbnail paths for many items at once.
+
+    Paths are built from the library on disk (`<id>.info/<name>_thumbnail.png`)
+    and only items whose thumbnail file is missing (Eagle keeps none for
+    small images) are asked through `ITEM.thumbnail`, concurrently.
+    Resolved paths are kept in an LRU cache that is invalidated when the
+    item's `lastModified` changes.
+
+    Parameters
+    ----------
+    api : EagleAPI
+    maxsize : int, optional
+        Number of items kept in the cache.
+    concurrency : int, optional
+        `ITEM.thumbnail` requests in flight for the fallback.
+    """
+
+    def __init__(self, api: 'EagleAPI', maxsize: int = 4096, concurrency: int = 8) -> None:
+        self.api = api
+        self.maxsize = maxsize
+        self.concurrency = concurrency
+        self._cache: collections.OrderedDict[str, tuple[int | None, str]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _get(self, id: str, version: int | None) -> str | None:
+        with self._lock:
+            entry = self._cache.get(id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(id)
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, id: str, version: int | None, path: str) -> None:
+        with self._lock:
+            self._cache[id] = (version, path)
+            self._cache.move_to_end(id)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def _api_thumbnail(self, id: str) -> str | None:
+        path = self.api.ITEM.thumbnail(id)
+        return path if isinstance(path, str) else None
+
+    def resolve(self, items: Iterable[types._Item | str]) -> dict[str, str | None]:
+        """Thumbnail path of each item (None when Eagle has none).
+
+        Items may be `_Item`s or ids; for a bare id the item's
+        `metadata.json` is read to learn its name and `lastModified`.
+        """
+        reader = LibraryReader(self.api.__libpath__)
+        result: dict[str, str | None] = {}
+        missing: list[tuple[str, int | None]] = []
+        for item in items:
+            if isinstance(item, str):
+                try:
+                    metadata = reader.metadata(item)
+                except FileNotFoundError:
+                    result[item] = None
+                    missing.append((item, None))
+                    continue
+                id, name = item, metadata['name']
+                version = metadata.get('lastModified', metadata.get('modificationTime'))
+            else:
+                id, name = item.id, item.name
+                version = item.lastModified
+                if version is UNDEFINED:
+                    version = item.modificationTime
+
+            path = self._get(id, version)
+            if path is None:
+                path = os.path.join(reader.itemDir(id), f'{name}_thumbnail.png')
+                if not os.path.exists(path):
+                    result[id] = None
+                    missing.append((id, version))
+                    continue
+                self._put(id, version, path)
+            result[id] = path
+
+        if missing:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=self.concurrency,
+                                    thread_name_prefix='pyeagle-thumbnail') as pool:
+                paths = pool.map(self._api_thumbnail, [id for id, _ in missing])
+                for (id, version), path in zip(missing, paths):
+                    if path is not None and version is not None:
+                        self._put(id, version, path)
+                    result[id] = path
+        return result
+
+    def read(self, items: Iterable[types._Item | str]) -> dict[str, bytes | None]:
+        """Like `resolve`, but return each thumbnail's bytes.
+
+        Files are read one at a time, so a large batch never holds more
+        than one descriptor open. Only a missing thumbnail gives None;
+        other I/O errors are raised.
+        """
+        result: dict[str, bytes | None] = {}
+        for id, path in self.resolve(items).items():
+            if path is None:
+                result[id] = None
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    result[id] = f.read()
+            except FileNotFoundError:
+                result[id] = None
+        return result
@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import requests
+
+
+class Transport():
+    """Base class of the HTTP layer used by `EagleAPI.get` / `EagleAPI.post`.
+
+    Subclass this and pass an instance as `EagleAPI(transport=...)` to
+    replace how requests reach the Eagle server.
+    """
+
+    def get(self, url: str, params: dict[str, Any]) -> dict:
+        raise NotImplementedError
+
+    def post(self, url: str, data: str) -> dict:
+        raise NotImplementedError
+
+    def lastResponseSize(self) -> int | None:
+        """Body size of the response the calling thread received since the last call, if known."""
+        return None
+
+    def lastParseSeconds(self) -> float | None:
+        """Seconds spent parsing that response's JSON, if known (see `lastResponseSize`)."""
+        return None
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PooledTransport(Transport):
+    """Keep-alive transport backed by a shared urllib3 connection pool.
+
+    All threads share one `requests.Session` whose `HTTPAdapter` pools
+    connections across them (pyeagle keeps no cookies or other session
+    state that threads could trample).
+
+    Parameters
+    ----------
+    pool_size : int, optional
+        Maximum number of kept-alive connections to the Eagle server.
+    timeout : float | tuple[float, float] | None, optional
+        `(connect, read)` timeout passed to every request.
+    retries : int, optional
+        How many times a request is retried on connection errors
+        (refused / reset / dropped keep-alive connections). Errors after
+        the request was sent are only retried for GET, so POSTs such as
+        `addFromPaths` are never sent twice.
+    backoff : float, optional
+        Backoff factor between retries (`backoff * 2 ** (n - 1)` seconds).
+    """
+
+    def __init__(self, pool_size: int = 10,
+                 timeout: float | tuple[float, float] | None = (3.05, 60),
+                 retries: int = 3, backoff: float = 0.1) -> None:
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._adapter = None
+        self._local = threading.local()
+        self._session: 'requests.Session | None' = None
+        self._lock = threading.Lock()
+
+    def _make_adapter(self):
+        # requests / urllib3 are imported on the first request, not at
+        # `import pyeagle` or `EagleAPI()`
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(total=self.retries, connect=self.retries, read=self.retries,
+                      status=0, backoff_factor=self.backoff,
+                      allowed_methods=frozenset({'GET'}), raise_on_status=False)
+        return HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size,
+                           max_retries=retry, pool_block=False)
+
+    @property
+    def session(self) -> 'requests.Session':
+        session = self._session
+        if session is None:
+            import requests
+            with self._lock:
+                if self._session is None:
+                    self._adapter = self._make_adapter()
+                    session = requests.Session()
+                    session.mount('http://', self._adapter)
+                    session.mount('https://', self._adapter)
+                    self._session = session
+                session = self._session
+        return session
+
+    def _json(self, response: 'requests.Response') -> dict:
+        local = self._local
+        local.responseSize = len(response.content)
+        start = time.perf_counter()
+        data = response.json()
+        local.parseSeconds = time.perf_counter() - start
+        return data
+
+    def get(self, url: str, params: dict[str, Any]) -> dict:
+        return self._json(self.session.get(url, params=params, timeout=self.timeout))
+
+    def post(self, url: str, data: str) -> dict:
+        return self._json(self.session.post(url, data=data, timeout=self.timeout))
+
+    def lastResponseSize(self) -> int | None:
+        size = getattr(self._local, 'responseSize', None)
+        self._local.responseSize = None
+        return size
+
+    def lastParseSeconds(self) -> float | None:
+        seconds = getattr(self._local, 'parseSeconds', None)
+        self._local.parseSeconds = None
+        return seconds
+
+    def close(self) -> None:
+        with self._lock:
+            session, self._session = self._session, None
+            adapter, self._adapter = self._adapter, None
+        if session is not None:
+            session.close()
+        if adapter is not None:
+            adapter.close()
+        self._local = threading.local()
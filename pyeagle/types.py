@@ -15,7 +15,7 @@ class EagleJSONEncoder(json.encoder.JSONEncoder):
     def default(self, o: Any) -> Any:
         if isinstance(o, APIResponce):
             newdict = {}
-            for k, v in o.__dict__.items():
+            for k, v in o._items():
                 if k in [] or v == UNDEFINED:
                     continue
 
@@ -28,13 +28,125 @@ class EagleJSONEncoder(json.encoder.JSONEncoder):
             return super().default(o)
 
 
+_warned_keys: set[tuple[type, str]] = set()
+
+
+def warn_unknown_key(cls: type, key: str) -> None:
+    """Warn about a key missing from the schema, once per (class, key)."""
+    if (cls, key) in _warned_keys:
+        return
+    _warned_keys.add((cls, key))
+    warnings.warn(f'\nUnknown Key "{key}" in <{cls.__name__}>. (Module bug or Updated Fanbox API.) '
+                  'You can use this key but there is no autocomplete.', stacklevel=3)
+
+
+class Pending():
+    """Raw payload of a nested attribute, decoded on first access (lazy mode)."""
+    __slots__ = ('raw', 'decode')
+
+    def __init__(self, raw: Any, decode) -> None:
+        self.raw = raw
+        self.decode = decode
+
+
+class _NestedSlot():
+    """Wraps the slot of a nested attribute and resolves `Pending` values.
+
+    Only installed on the lazy variants of the response classes (see
+    `lazy_variant`), so eager objects keep the native slot descriptors.
+    """
+    __slots__ = ('member',)
+
+    def __init__(self, member) -> None:
+        self.member = member
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = self.member.__get__(obj, objtype)
+        if type(value) is Pending:
+            value = value.decode(value.raw)
+            self.member.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value) -> None:
+        self.member.__set__(obj, value)
+
+    def __delete__(self, obj) -> None:
+        self.member.__delete__(obj)
+
+
 class APIResponce():
+    """Base of every response record.
+
+    Known attributes live in `__slots__`; `_fields` lists them in the order
+    they are serialized. Keys the schema does not know about are kept in
+    the `_extra` overflow mapping (None when there are none) and are still
+    readable as attributes.
+    """
+    __slots__ = ('_extra',)
+    _fields: tuple[str, ...] = ()
+
+    # Decoding schema used by `decoder.py`, merged along the MRO.
+    # _sources: attribute -> payload key, when they differ.
+    # _nested: attribute -> ('one' | 'list', class name) or ('call', method name)
+    _sources: dict[str, str] = {'_hashKey': '$$hashKey'}
+    _nested: dict[str, tuple[str, str]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(cls.__dict__.get('__slots__', ())) + cls._fields
+
     def __init__(self, **kwargs) -> None:
+        self._extra: dict[str, Any] | None = None
+        if not kwargs:
+            return
 
+        self._extra = {}
         for k, v in kwargs.items():
-            warnings.warn(f'\nUnknown Key "{k}" in <{type(self).__name__}>. (Module bug or Updated Fanbox API.) '
-                          'You can use this key but there is no autocomplete.')
-            setattr(self, k, v)
+            warn_unknown_key(type(self), k)
+            self._extra[k] = v
+
+    def __getattr__(self, name: str) -> Any:
+        if name == '_extra':
+            raise AttributeError(name)
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _items(self):
+        for k in self._fields:
+            yield k, getattr(self, k)
+        if self._extra is not None:
+            yield from self._extra.items()
+
+
+_lazy_variants: dict[type, type] = {}
+
+
+def lazy_variant(cls: type) -> type:
+    """Subclass of `cls` whose nested attributes resolve `Pending` values.
+
+    Used by the lazy decoders. Instances pass `isinstance(o, cls)` and
+    keep the class name; classes without nested records are returned
+    unchanged.
+    """
+    variant = _lazy_variants.get(cls)
+    if variant is not None:
+        return variant
+    import inspect
+    namespace: dict[str, Any] = {'__slots__': (), '__module__': cls.__module__,
+                                 '__qualname__': cls.__qualname__}
+    for klass in cls.__mro__:
+        for attr, (kind, _) in klass.__dict__.get('_nested', {}).items():
+            if kind != 'call' and attr not in namespace:
+                member = inspect.getattr_static(cls, attr)
+                if type(member).__name__ == 'member_descriptor':
+                    namespace[attr] = _NestedSlot(member)
+    variant = type(cls.__name__, (cls,), namespace) if len(namespace) > 3 else cls
+    _lazy_variants[cls] = variant
+    return variant
 
 
 # T = TypeVar('EagleResponce', (_NewFolder, _Palette, _Item, _Styles, _ImagesMappings, _Folder, _Rule))
@@ -62,6 +174,9 @@ def mapdict(_d: dict[str, dict], type: type) -> dict[str, Any]:
 # === Responce Element ===
 
 class _NewFolder(APIResponce):
+    __slots__ = ('id', 'name', 'images', 'folders', 'modificationTime',
+                 'imagesMappings', 'tags', 'children', 'isExpand')
+
     def __init__(self, id: str,
                  name: str,
                  images: list,
@@ -87,6 +202,8 @@ class _NewFolder(APIResponce):
 
 
 class _Palette(APIResponce):
+    __slots__ = ('color', 'ratio', '_hashKey')
+
     def __init__(self, color: list[int],
                  ratio: int,
                  **kwargs) -> None:
@@ -104,6 +221,15 @@ class _Palette(APIResponce):
 
 
 class _Item(APIResponce):
+    __slots__ = ('id', 'name', 'size', 'btime', 'mtime', 'ext', 'tags', 'folders',
+                 'isDeleted', 'url', 'annotation', '_raw_annotation',
+                 'modificationTime', 'height', 'width', 'palettes',
+                 'lastModified', 'noThumbnail', 'deletedTime', 'noPreview',
+                 'text', 'duration')
+    _sources = {'_raw_annotation': 'annotation'}
+    _nested = {'annotation': ('call', 'format_annotation'),
+               'palettes': ('list', '_Palette')}
+
     def __init__(self, id: str,
                  name: str,
                  size: int,
@@ -155,12 +281,18 @@ class _Item(APIResponce):
 
         super().__init__(**kwargs)
     
+    _link_pattern = re.compile(r'<a href=".+" target="_blank">(.+)</a>')
+
     @staticmethod
     def format_annotation(anno_text):
-        return re.sub(r'<a href=".+" target="_blank">(.+)</a>', r'\1', anno_text)
+        if '<a href="' not in anno_text:
+            return anno_text
+        return _Item._link_pattern.sub(r'\1', anno_text)
 
 
 class _Styles(APIResponce):
+    __slots__ = ('depth', 'first', 'last')
+
     def __init__(self, depth: int,
                  first: bool,
                  last: bool,
@@ -174,11 +306,26 @@ class _Styles(APIResponce):
 
 
 class _ImagesMappings(APIResponce):
+    __slots__ = ()
+
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
 
 
 class _Folder(APIResponce):
+    __slots__ = ('id', 'name', 'description', 'children', 'modificationTime',
+                 'tags', 'password', 'passwordTips', 'parent', 'isExpand',
+                 'images', 'size', 'vstype', 'styles', 'isVisible', 'index',
+                 'newFolderName', 'imagesMappings', 'imageCount',
+                 'descendantImageCount', 'pinyin', 'extendTags', 'covers',
+                 'editable', 'iconColor', 'icon', 'coverId', 'orderBy',
+                 'sortIncrease', 'isSelected', 'folders', '_hashKey')
+    _nested = {'children': ('list', '_Folder'),
+               'images': ('list', '_Item'),
+               'styles': ('one', '_Styles'),
+               'imagesMappings': ('one', '_ImagesMappings'),
+               'folders': ('list', '_Folder')}
+
     def __init__(self, id: str,
                  name: str,
                  children: list[dict],
@@ -254,6 +401,8 @@ class _Folder(APIResponce):
 
 
 class _Rule(APIResponce):
+    __slots__ = ('property', 'method', 'value', '_hashKey')
+
     def __init__(self, property: str,
                  method: str,
                  value: str,
@@ -273,6 +422,9 @@ class _Rule(APIResponce):
 
 
 class _Condition(APIResponce):
+    __slots__ = ('rules', 'match', 'boolean', '_hashKey')
+    _nested = {'rules': ('list', '_Rule')}
+
     def __init__(self, rules: list[dict],
                  match: Literal['AND', 'OR'],
                  boolean: Literal['TRUE', 'FALSE'],
@@ -292,6 +444,9 @@ class _Condition(APIResponce):
 
 
 class _SmartFolder(_Folder):
+    __slots__ = ('conditions',)
+    _nested = {'conditions': ('list', '_Condition')}
+
     def __init__(self, conditions: list[dict],
                  id: str,
                  name: str,
@@ -341,6 +496,8 @@ class _SmartFolder(_Folder):
 
 
 class _TagsGroup(APIResponce):
+    __slots__ = ('id', 'name', 'tags', 'color')
+
     def __init__(self, id: str,
                  name: str,
                  tags: list[str],
@@ -358,6 +515,9 @@ class _TagsGroup(APIResponce):
 # === Eagle API Responce ===
 
 class _ApplicationInfo(APIResponce):
+    __slots__ = ('version', 'prereleaseVersion', 'buildVersion', 'execPath',
+                 'platform')
+
     def __init__(self, version: str,
                  prereleaseVersion: str | None,
                  buildVersion: str,
@@ -375,6 +535,8 @@ class _ApplicationInfo(APIResponce):
 
 
 class _Library(APIResponce):
+    __slots__ = ('path', 'name')
+
     def __init__(self, path: str,
                  name: str,
                  **kwargs) -> None:
@@ -386,6 +548,14 @@ class _Library(APIResponce):
 
 
 class _LibraryInfo(APIResponce):
+    __slots__ = ('folders', 'smartFolders', 'quickAccess', 'tagsGroups',
+                 'modificationTime', 'applicationVersion', 'library')
+    _nested = {'folders': ('list', '_Folder'),
+               'smartFolders': ('list', '_SmartFolder'),
+               'quickAccess': ('list', 'APIResponce'),
+               'tagsGroups': ('list', '_TagsGroup'),
+               'library': ('one', '_Library')}
+
     def __init__(self, folders: list[dict],
                  smartFolders: list[dict],
                  quickAccess: list[Any],
@@ -409,6 +579,9 @@ class _LibraryInfo(APIResponce):
 # ===
 
 class OnlineItem(APIResponce):
+    __slots__ = ('url', 'name', 'website', 'tags', 'annotation',
+                 'modificationTime', 'headers')
+
     def __init__(self, url: str,
                  name: str, *,
                  website: str = UNDEFINED,  # type: ignore
@@ -430,6 +603,8 @@ class OnlineItem(APIResponce):
 
 
 class OfflineItem(APIResponce):
+    __slots__ = ('path', 'name', 'website', 'tags', 'annotation', 'headers')
+
     def __init__(self, path: str,
                  name: str, *,
                  website: str | Type[UNDEFINED] = UNDEFINED,
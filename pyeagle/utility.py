@@ -1,10 +1,12 @@
-from glob import glob
-import json
 import os
-from datetime import datetime
-from typing import TYPE_CHECKING, Literal, Type, overload
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Literal, Type, overload
 
 from . import types
+from .importer import BatchResult, FolderImporter, ImportManifest, ImportReport
+from .journal import Transaction, would_overwrite
+from .library import open_json
+from .thumbnails import ThumbnailCache
 
 if TYPE_CHECKING:
     from .main import EagleAPI
@@ -12,36 +14,106 @@ if TYPE_CHECKING:
 from .types import UNDEFINED, _Folder
 
 
-class Backup():
-    def __init__(self) -> None:
-        self.backups = {}
+class FolderIndex():
+    """Flat lookup tables over a folder tree.
 
-    def backup(self, *paths):
-        for path in paths:
-            abspath = os.path.abspath(path)
-            with open(abspath, 'rb') as f:
-                self.backups[abspath] = f.read()
+    Built once from the result of `FOLDER.list()`. `stamp` records the
+    library state the tree was read at, so the owner can tell when the
+    index has gone stale.
+    """
 
-    def restore(self):
-        for k, v in self.backups:
-            with open(k, 'wb') as f:
-                f.write(v)
+    def __init__(self, folders: list[_Folder], stamp: Any = None) -> None:
+        self.folders = folders
+        self.stamp = stamp
+        self.byID: dict[str, _Folder] = {}
+        self.byName: dict[str, list[_Folder]] = {}
+        self.parentOf: dict[str, str | None] = {}
+
+        # pre-order DFS, so byName keeps the order of a recursive search
+        stack: list[tuple[_Folder, str | None]] = [(f, None) for f in reversed(folders)]
+        while stack:
+            folder, parent_id = stack.pop()
+            self.byID[folder.id] = folder
+            self.byName.setdefault(folder.name, []).append(folder)
+            self.parentOf[folder.id] = parent_id
+            stack.extend((child, folder.id) for child in reversed(folder.children))
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.byID
+
+    def __len__(self) -> int:
+        return len(self.byID)
+
+    def get(self, id: str) -> _Folder | None:
+        return self.byID.get(id)
+
+    def path(self, target_id: str, root_id: str | None = None) -> list[_Folder] | None:
+        """Folders from `root_id` (or the top level) down to `target_id`.
+
+        Returns None if `target_id` is unknown or not under `root_id`.
+        """
+        if target_id not in self.byID:
+            return None
+        chain = []
+        current: str | None = target_id
+        while current is not None:
+            chain.append(self.byID[current])
+            if current == root_id:
+                break
+            current = self.parentOf[current]
+        else:
+            if root_id is not None:
+                return None
+        chain.reverse()
+        return chain
+
+    def findByName(self, name: str, root_id: str | None = None) -> list[_Folder]:
+        founded = self.byName.get(name, [])
+        if root_id is None:
+            return list(founded)
+        return [f for f in founded if self.path(f.id, root_id) is not None]
 
 
 class Utility():
     def __init__(self, eapi: 'EagleAPI') -> None:
         self.__eapi = eapi
-    
-    @staticmethod
-    def __recGetFolderByID(folder: types._Folder, id: str) -> types._Folder | None:
-        if folder.id == id:
-            return folder
-        else:
-            for child in folder.children:
-                result = Utility.__recGetFolderByID(child, id)
-                if result is not None:
-                    return result
+        self.__folderIndex: FolderIndex | None = None
+        self.__thumbnails: ThumbnailCache | None = None
+
+    def __libraryStamp(self) -> int | None:
+        try:
+            return os.stat(os.path.join(self.__eapi.__libpath__, 'metadata.json')).st_mtime_ns
+        except OSError:
             return None
+
+    def folderIndex(self) -> FolderIndex:
+        """Return the cached `FolderIndex`, rebuilding it if stale.
+
+        The index is rebuilt when the library's `metadata.json` (which holds
+        the folder tree and its `modificationTime`) has changed on disk, or
+        after `invalidateFolderIndex()`. FOLDER.create / rename / update
+        invalidate it automatically. When `metadata.json` cannot be read
+        (e.g. Eagle runs on another host) there is no way to tell, so the
+        index is rebuilt on every call.
+        """
+        stamp = self.__libraryStamp()
+        index = self.__folderIndex
+        if index is None or stamp is None or index.stamp != stamp:
+            if index is not None and stamp is not None and self.__eapi.cache is not None:
+                # changed outside this client: a cached tree would be stale too
+                self.__eapi.cache.invalidate('/folder/list')
+            folders = self.__eapi.FOLDER.list()
+            if not isinstance(folders, list):
+                raise RuntimeError(f'Failed to list folders: {folders}')
+            index = self.__folderIndex = FolderIndex(folders, stamp)
+        return index
+
+    def invalidateFolderIndex(self) -> None:
+        self.__folderIndex = None
+
+    def transaction(self, durable: bool = False) -> Transaction:
+        """Journaled transaction for direct edits of the library files."""
+        return Transaction(self.__eapi.__libpath__, durable)
     
     @overload
     def getFolderByID(self, id: str) -> types._Folder | None: ...
@@ -51,11 +123,9 @@ class Utility():
     def getFolderByID(self, id: str, raise_error: Literal[False] = False) -> types._Folder | None: ...
 
     def getFolderByID(self, id: str, raise_error=False) -> types._Folder | None:
-        folders = self.__eapi.FOLDER.list()
-        for folder in folders:
-            result = Utility.__recGetFolderByID(folder, id)
-            if result is not None:
-                return result
+        result = self.folderIndex().get(id)
+        if result is not None:
+            return result
         if raise_error:
             raise KeyError(f'folder id {id} is not found.')
         else:
@@ -90,28 +160,17 @@ class Utility():
         list[types._Folder]
 
         """
+        index = self.folderIndex()
         if parent is None:
-            folders = self.__eapi.FOLDER.list()
+            return index.findByName(name)
+        elif parent.id in index:
+            return index.findByName(name, parent.id)
         else:
-            folders = [parent]
-        founded = []
-        for folder in folders:
-            founded.extend(Utility.__recGetFoldersByName(folder, name))
-        return founded
+            return Utility.__recGetFoldersByName(parent, name)
     
     @staticmethod
     def __open_json(path: str, limit=30, sleep=0.1):
-        for _ in range(limit):
-            try:
-                with open(path) as f:
-                    data = json.load(f)
-                break
-            except json.JSONDecodeError as err:
-                error = err
-        else:
-            raise error
-        
-        return data
+        return open_json(path, limit, sleep)
     
     def renameItem(self, fileid: str, new_name: str):
         """rename eagle file
@@ -129,55 +188,73 @@ class Utility():
         new_name : str
             new name without extention.
         """
-        backup = Backup()
-        try:
-            # prepare variables
-            timestamp = int(datetime.utcnow().timestamp() * 1000)
-            item_dir = f'{self.__eapi.__libpath__}\\images\\{fileid}.info'
-
-            # load metadata
-            meta_path = item_dir + '\\metadata.json'
-            metadata = Utility.__open_json(meta_path)
-            backup.backup(meta_path)
-            
-            mtime_path = self.__eapi.__libpath__ + '\\mtime.json'
-            mtime = Utility.__open_json(mtime_path)
-            backup.backup(mtime_path)
+        self.renameItems({fileid: new_name})
 
-            # rename files
-            old_name = metadata['name']
-            old_ext = metadata['ext']
+    def renameItems(self, mapping: dict[str, str]):
+        """rename many eagle files at once
 
-            old_path = f'{item_dir}\\{old_name}.{old_ext}'
-            old_thumb_path = f'{item_dir}\\{old_name}_thumbnail.png'
-            new_path = f'{item_dir}\\{new_name}.{old_ext}'
-            new_thumb_path = f'{item_dir}\\{new_name}_thumbnail.png'
+        Every target is validated before anything is touched. Files and
+        thumbnails are renamed, each `metadata.json` is replaced atomically
+        and `mtime.json` is written once for the whole batch, all inside a
+        journaled `Transaction`: if any step fails (or the process dies),
+        the batch is rolled back.
+
+        Warning!
+        --------
+        This method work without eagle api
 
-            if os.path.exists(old_path):
-                os.rename(old_path, new_path)
-            if os.path.exists(old_thumb_path):
-                os.rename(old_thumb_path, new_thumb_path)
+        Parameters
+        ----------
+        mapping : dict[str, str]
+            item id -> new name without extention.
 
-            # update metadata
-            metadata['name'] = new_name
-            metadata['lastModified'] = timestamp
+        Raises
+        ------
+        KeyError
+            An item does not exist in the library.
+        ValueError
+            A new name is empty or contains a path separator.
+        FileExistsError
+            A renamed file would overwrite another file.
+        """
+        libpath = self.__eapi.__libpath__
+        timestamp = int(time.time() * 1000)
 
-            mtime[fileid] = timestamp
+        with Transaction(libpath) as txn:
+            # validate everything before the first change
+            plans = []
+            for fileid, new_name in mapping.items():
+                if not new_name or new_name in ('.', '..') or any(c in new_name for c in '/\\\0'):
+                    raise ValueError(f'invalid item name {new_name!r}')
+                item_dir = os.path.join(libpath, 'images', f'{fileid}.info')
+                meta_path = os.path.join(item_dir, 'metadata.json')
+                try:
+                    metadata = Utility.__open_json(meta_path)
+                except FileNotFoundError:
+                    raise KeyError(f'item {fileid} is not found.') from None
+                old_name, ext = metadata['name'], metadata['ext']
+                moves = []
+                if new_name != old_name:
+                    for old, new in ((f'{old_name}.{ext}', f'{new_name}.{ext}'),
+                                     (f'{old_name}_thumbnail.png', f'{new_name}_thumbnail.png')):
+                        old, new = os.path.join(item_dir, old), os.path.join(item_dir, new)
+                        if would_overwrite(old, new):
+                            raise FileExistsError(f'{new} already exists')
+                        if os.path.exists(old):
+                            moves.append((old, new))
+                plans.append((fileid, meta_path, metadata, new_name, moves))
+
+            mtime_path = os.path.join(libpath, 'mtime.json')
+            mtime = Utility.__open_json(mtime_path)
+
+            for fileid, meta_path, metadata, new_name, moves in plans:
+                for old, new in moves:
+                    txn.rename(old, new)
+                txn.write_json(meta_path, dict(metadata, name=new_name, lastModified=timestamp),
+                               ensure_ascii=False)
+                mtime[fileid] = timestamp
+            txn.write_json(mtime_path, mtime)
 
-            # write metadata
-            with open(mtime_path, 'w') as f:
-                json.dump(mtime, f)
-            with open(meta_path, 'w') as f:
-                json.dump(metadata, f, ensure_ascii=False)
-            
-        except:  # noqa: E722
-            backup.restore()
-            if 'new_path' in locals() and os.path.exists(new_path):
-                os.rename(new_path, old_path)
-            if 'new_thumb_path' in locals() and os.path.exists(new_thumb_path):
-                os.rename(new_thumb_path, old_thumb_path)
-            
-            raise
     @overload
     def itemOriginalFilePath(self, item: types._Item) -> str: ...
     @overload
@@ -187,41 +264,70 @@ class Utility():
     
     def itemOriginalFilePath(self, *args, **kwargs) -> str:
         if isinstance(args[0], types._Item):
-            return self.__eapi.__libpath__ + '\\images\\' + args[0].id + '.info\\' + args[0].name + '.' + args[0].ext
+            filename = args[0].name + '.' + args[0].ext
+            return os.path.join(self.__eapi.__libpath__, 'images', args[0].id + '.info', filename)
         elif len(args) == 2:
-            return self.__eapi.__libpath__ + '\\images\\' + args[0] + '.info\\' + args[1]
+            return os.path.join(self.__eapi.__libpath__, 'images', args[0] + '.info', args[1])
         else:
-            return self.__eapi.__libpath__ + '\\images\\' + args[0] + '.info\\' + args[1] + '.' + args[2]
+            filename = args[1] + '.' + args[2]
+            return os.path.join(self.__eapi.__libpath__, 'images', args[0] + '.info', filename)
         
     def itemThumbnailFilePath(self, item: types._Item):
-        return self.__eapi.__libpath__ + '\\images\\' + item.id + '.info\\' + item.name + '_thumbnail.png'
+        """Path of the thumbnail Eagle generates for `item`.
+
+        Small images have no thumbnail file; use `thumbnails()` to fall
+        back to the path Eagle reports.
+        """
+        return os.path.join(self.__eapi.__libpath__, 'images', item.id + '.info',
+                            item.name + '_thumbnail.png')
+
+    @overload
+    def thumbnails(self, items: Iterable[types._Item | str]) -> dict[str, str | None]: ...
+    @overload
+    def thumbnails(self, items: Iterable[types._Item | str],
+                   asBytes: Literal[True] = True) -> dict[str, bytes | None]: ...
+
+    def thumbnails(self, items, asBytes=False) -> Any:
+        """Thumbnails of many items: id -> path (or the file's bytes with `asBytes`).
+
+        Resolved from disk where possible, through concurrent
+        `ITEM.thumbnail` calls otherwise, and cached per item until its
+        `lastModified` changes (see `ThumbnailCache`).
+        """
+        if self.__thumbnails is None:
+            self.__thumbnails = ThumbnailCache(self.__eapi)
+        if asBytes:
+            return self.__thumbnails.read(items)
+        return self.__thumbnails.resolve(items)
     
     def importFolder(self, src: str, name: str | None = None,
                      parent: str | None = None,
                      website: str | Type[UNDEFINED] = UNDEFINED,
                      tags: list[str] | Type[UNDEFINED] = UNDEFINED,
-                     annotation: str | Type[UNDEFINED] = UNDEFINED):
-        if not name:
-            name = os.path.basename(src)
-        pfolder = self.__eapi.FOLDER.create(name, parent)
-        if not isinstance(pfolder, types._NewFolder):
-            raise RuntimeError('Create Folder Faild')
-
-        paths = glob(src + '\\*')
-        for dir in [p for p in paths if os.path.isdir(p)]:
-            self.importFolder(dir, None, pfolder.id, website, tags, annotation)
-        append_files: list[types.OfflineItem] = []
-        for file in [p for p in paths if os.path.isfile(p)]:
-            append_files.append(types.OfflineItem(
-                os.path.abspath(file),
-                '.'.join(os.path.basename(file).split('.')[:-1]),
-                website=website,
-                tags=tags,
-                annotation=annotation
-            ))
-        if len(append_files) > 0:
-            self.__eapi.ITEM.addFromPaths(append_files, pfolder.id)
+                     annotation: str | Type[UNDEFINED] = UNDEFINED, *,
+                     batchSize: int = 500, concurrency: int = 4,
+                     folderConcurrency: int = 4,
+                     progress: Callable[[BatchResult], None] | None = None,
+                     manifest: ImportManifest | str | None = None,
+                     hashWorkers: int | None = None,
+                     skipDuplicates: bool = False) -> ImportReport:
+        """Import the directory tree `src` as a new folder under `parent`.
 
+        See `FolderImporter` for how folders and files are sent. Failed
+        `addFromPaths` batches do not stop the import; they are listed in
+        `ImportReport.failed`. With a `manifest`, re-running the same
+        import only sends new or changed files into the existing folders.
+        """
+        importer = FolderImporter(self.__eapi, batchSize=batchSize,
+                                  concurrency=concurrency,
+                                  folderConcurrency=folderConcurrency,
+                                  progress=progress, manifest=manifest,
+                                  hashWorkers=hashWorkers,
+                                  skipDuplicates=skipDuplicates)
+        try:
+            return importer.run(src, name, parent, website, tags, annotation)
+        finally:
+            importer.close()
 
     @staticmethod
     def recursive_get_parents(target_id: str, parent: _Folder) -> list[_Folder] | None:
@@ -240,7 +346,11 @@ class Utility():
         return None
     
     def get_parents(self, target_id: str, root_parent: _Folder):
-        parents = Utility.recursive_get_parents(target_id, root_parent)
+        index = self.folderIndex()
+        if root_parent.id in index:
+            parents = index.path(target_id, root_parent.id)
+        else:
+            parents = Utility.recursive_get_parents(target_id, root_parent)
 
         if parents is None:
             raise KeyError(f'Folder "{target_id}" '